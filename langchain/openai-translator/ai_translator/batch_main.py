@@ -0,0 +1,52 @@
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils import ArgumentParser, LOG, METRICS
+from translator import PDFTranslator, TranslationConfig, TranslationCache
+from translator.batch_translator import BatchTranslator, collect_books
+from translator.rate_limiter import RateLimiter
+from translator.translation_chain import TranslationChain
+
+if __name__ == "__main__":
+    # 解析命令行
+    argument_parser = ArgumentParser()
+    args = argument_parser.parse_arguments()
+
+    # 初始化配置单例
+    config = TranslationConfig()
+    config.initialize(args)
+
+    books = collect_books(config.input_dir, config.manifest)
+    if not books:
+        LOG.error("没有找到待翻译的 PDF，请通过 --input_dir 或 --manifest 指定")
+        sys.exit(1)
+
+    # 所有书共用一个缓存、一个模型链和一个限流器
+    cache = None if config.no_cache else TranslationCache(config.cache_file, config.cache_max_entries)
+    translate_chain = TranslationChain(config.model_name)
+    rate_limiter = RateLimiter(config.rpm, config.tpm) if config.rpm or config.tpm else None
+
+    def translator_factory(executor):
+        return PDFTranslator(config.model_name,
+                             max_workers=config.max_workers,
+                             cache=cache,
+                             pack_token_budget=config.pack_token_budget,
+                             stream_window=config.stream_window,
+                             parse_workers=config.parse_workers,
+                             journal_dir=config.journal_dir,
+                             resume=config.resume,
+                             translate_chain=translate_chain,
+                             render_workers=config.render_workers,
+                             dedupe_boilerplate=config.dedupe_boilerplate,
+                             executor=executor,
+                             rate_limiter=rate_limiter)
+
+    batch_translator = BatchTranslator(translator_factory, config.max_workers, config.book_workers)
+    report = batch_translator.translate_books(books, config.output_file_format,
+                                              config.source_language, config.target_language)
+    report["metrics"] = METRICS.summary()
+    if rate_limiter:
+        report["rate_limiter"] = rate_limiter.metrics()
+    BatchTranslator.save_report(report, config.batch_report)
@@ -1,9 +1,26 @@
+import copy
+
 from .page import Page
 
 class Book:
+    __slots__ = ("pdf_file_path", "pages")
+
     def __init__(self, pdf_file_path):
         self.pdf_file_path = pdf_file_path
         self.pages = []
 
     def add_page(self, page: Page):
-        self.pages.append(page)
\ No newline at end of file
+        self.pages.append(page)
+
+    def copy_untranslated(self) -> "Book":
+        """复制页面结构，原文对象在副本间共享、只读，译文为空，用于同一本书翻译成多种语言。"""
+        book = Book(self.pdf_file_path)
+        for page in self.pages:
+            new_page = Page()
+            for content in page.contents:
+                new_content = copy.copy(content)
+                new_content.translation = None
+                new_content.status = False
+                new_page.add_content(new_content)
+            book.add_page(new_page)
+        return book
@@ -1,9 +1,7 @@
-import pandas as pd
+import re
 
 from enum import Enum, auto
-from PIL import Image as PILImage
 from utils import LOG
-from io import StringIO
 
 class ContentType(Enum):
     TEXT = auto()
@@ -11,6 +9,8 @@ class ContentType(Enum):
     IMAGE = auto()
 
 class Content:
+    __slots__ = ("content_type", "original", "translation", "status")
+
     def __init__(self, content_type, original, translation=None):
         self.content_type = content_type
         self.original = original
@@ -28,23 +28,39 @@ class Content:
             return True
         elif self.content_type == ContentType.TABLE and isinstance(translation, list):
             return True
-        elif self.content_type == ContentType.IMAGE and isinstance(translation, PILImage.Image):
-            return True
+        elif self.content_type == ContentType.IMAGE:
+            from PIL import Image as PILImage
+            return isinstance(translation, PILImage.Image)
         return False
 
     def __str__(self):
         return self.original
 
 
+ROW_PATTERN = re.compile(r"\[(.*?)\]", re.DOTALL)
+
+
+def _format_cell(cell) -> str:
+    if isinstance(cell, (list, tuple)):
+        return "[" + ", ".join(_format_cell(item) for item in cell) + "]"
+    return str(cell)
+
+
 class TableContent(Content):
+    """表格以行列表的形式保存，只有调用 to_dataframe() 时才创建 DataFrame。
+
+    original 的每一行对应 PDFParser 提取的一个表格（单元格为该表格的一行），
+    translation 为译文的行列表，第一行是表头。
+    """
+    __slots__ = ()
+
     def __init__(self, data, translation=None):
-        df = pd.DataFrame(data)
+        if not data:
+            raise ValueError("The extracted table data is empty.")
 
-        # Verify if the number of rows and columns in the data and DataFrame object match
-        if len(data) != len(df) or len(data[0]) != len(df.columns):
-            raise ValueError("The number of rows and columns in the extracted table data and DataFrame object do not match.")
-        
-        super().__init__(ContentType.TABLE, df)
+        # 同一页的多个表格行数可能不同，与 pd.DataFrame 一样用 None 补齐成矩形
+        width = max(len(row) for row in data)
+        super().__init__(ContentType.TABLE, [list(row) + [None] * (width - len(row)) for row in data])
 
     def set_translation(self, translation, status):
         try:
@@ -52,34 +68,51 @@ class TableContent(Content):
                 raise ValueError(f"Invalid translation type. Expected str, but got {type(translation)}")
 
             LOG.debug(f"[translation]\n{translation}")
-            # Extract column names from the first set of brackets
-            header = translation.split(']')[0][1:].split(', ')
-            # Extract data rows from the remaining brackets
-            data_rows = translation.split('] ')[1:]
-            # Replace Chinese punctuation and split each row into a list of values
-            data_rows = [row[1:-1].split(', ') for row in data_rows]
-            # Create a DataFrame using the extracted header and data
-            translated_df = pd.DataFrame(data_rows, columns=header)
-            LOG.debug(f"[translated_df]\n{translated_df}")
-            self.translation = translated_df
+            # 译文形如 "[表头1, 表头2] [值1, 值2] ..."，每对方括号为一行，第一行为表头
+            rows = [row.split(', ') for row in ROW_PATTERN.findall(translation)]
+            if not rows:
+                raise ValueError("No table rows found in translation.")
+            header = rows[0]
+            if any(len(row) != len(header) for row in rows[1:]):
+                raise ValueError(f"{len(header)} columns passed, but some rows have a different number of columns.")
+            LOG.debug(f"[translated_rows]\n{rows}")
+            self.translation = rows
             self.status = status
         except Exception as e:
             LOG.error(f"An error occurred during table translation: {e}")
             self.translation = None
             self.status = False
 
+    @property
+    def translated_header(self):
+        return self.translation[0] if self.translation else []
+
+    @property
+    def translated_rows(self):
+        return self.translation[1:] if self.translation else []
+
+    def to_dataframe(self, translated=False):
+        import pandas as pd
+
+        if translated:
+            return pd.DataFrame(self.translated_rows, columns=self.translated_header)
+        return pd.DataFrame(self.original)
+
     def __str__(self):
-        return self.original.to_string(header=False, index=False)
+        return self.get_original_as_str()
 
     def iter_items(self, translated=False):
-        target_df = self.translation if translated else self.original
-        for row_idx, row in target_df.iterrows():
+        target_rows = self.translated_rows if translated else self.original
+        for row_idx, row in enumerate(target_rows):
             for col_idx, item in enumerate(row):
                 yield (row_idx, col_idx, item)
 
     def update_item(self, row_idx, col_idx, new_value, translated=False):
-        target_df = self.translation if translated else self.original
-        target_df.at[row_idx, col_idx] = new_value
+        target_rows = self.translated_rows if translated else self.original
+        target_rows[row_idx][col_idx] = new_value
 
     def get_original_as_str(self):
-        return self.original.to_string(header=False, index=False)
\ No newline at end of file
+        # 与 DataFrame.to_string(header=False, index=False) 的输出保持一致：各列右对齐
+        cells = [[_format_cell(cell) for cell in row] for row in self.original]
+        widths = [max(len(row[col_idx]) for row in cells) for col_idx in range(len(cells[0]))]
+        return "\n".join(" ".join(cell.rjust(width) for cell, width in zip(row, widths)) for row in cells)
@@ -1,11 +1,15 @@
 import sys
 import os
+import json
 
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from flask import Flask, request, send_file, jsonify
-from translator import PDFTranslator, TranslationConfig
-from utils import ArgumentParser, LOG
+from flask import Flask, Response, request, send_file, jsonify, url_for
+from werkzeug.utils import secure_filename
+from translator import PDFTranslator, TranslationConfig, TranslationCache
+from translator.job_manager import JobManager, TranslationJob, QueueFullException
+from translator.translation_chain import TranslationChain
+from utils import ArgumentParser, LOG, METRICS
 
 app = Flask(__name__)
 
@@ -17,32 +21,41 @@ def translation():
         input_file = request.files['input_file']
         source_language = request.form.get('source_language', 'English')
         target_language = request.form.get('target_language', 'Chinese')
+        output_file_format = request.form.get('output_file_format', config.output_file_format)
 
         LOG.debug(f"[input_file]\n{input_file}")
         LOG.debug(f"[input_file.filename]\n{input_file.filename}")
 
         if input_file and input_file.filename:
-            # # 创建临时文件
-            input_file_path = TEMP_FILE_DIR+input_file.filename
+            job = TranslationJob(None, source_language, target_language, output_file_format)
+
+            # 创建临时文件，每个任务一个目录，避免不同请求互相覆盖
+            job_dir = os.path.join(TEMP_FILE_DIR, job.job_id)
+            os.makedirs(job_dir, exist_ok=True)
+            # secure_filename 会去掉中文等非 ASCII 字符，文件名为空或丢了扩展名时改用固定名称，
+            # 否则 Writer 无法把 .pdf 替换为译文扩展名，会覆盖上传文件
+            filename = secure_filename(input_file.filename)
+            if not filename.endswith('.pdf') or filename == '.pdf':
+                filename = 'input.pdf'
+            input_file_path = os.path.join(job_dir, filename)
             LOG.debug(f"[input_file_path]\n{input_file_path}")
 
             input_file.save(input_file_path)
+            job.input_file = input_file_path
 
-            # 调用翻译函数
-            output_file_path = Translator.translate_pdf(
-                input_file=input_file_path,
-                source_language=source_language,
-                target_language=target_language)
-            
-            # 移除临时文件
-            # os.remove(input_file_path)
-
-            # 构造完整的文件路径
-            output_file_path = os.getcwd() + "/" + output_file_path
-            LOG.debug(output_file_path)
-
-            # 返回翻译后的文件
-            return send_file(output_file_path, as_attachment=True)
+            # 加入任务队列，立即返回任务 ID
+            try:
+                Jobs.submit(job)
+            except QueueFullException as e:
+                os.remove(input_file_path)
+                return jsonify({'status': 'error', 'message': str(e)}), 429
+
+            response = job.to_dict()
+            response['status_url'] = url_for('translation_status', job_id=job.job_id)
+            response['result_url'] = url_for('translation_result', job_id=job.job_id)
+            return jsonify(response), 202
+
+        return jsonify({'status': 'error', 'message': 'input_file is required'}), 400
     except Exception as e:
         response = {
             'status': 'error',
@@ -51,21 +64,93 @@ def translation():
         return jsonify(response), 400
 
 
+@app.route('/translation/<job_id>', methods=['GET'])
+def translation_status(job_id):
+    job = Jobs.get(job_id)
+    if job is None:
+        return jsonify({'status': 'error', 'message': f'Job {job_id} not found'}), 404
+    return jsonify(job.to_dict())
+
+
+@app.route('/translation/<job_id>/result', methods=['GET'])
+def translation_result(job_id):
+    job = Jobs.get(job_id)
+    if job is None:
+        return jsonify({'status': 'error', 'message': f'Job {job_id} not found'}), 404
+    if job.status != TranslationJob.DONE:
+        return jsonify(job.to_dict()), 409
+
+    # 构造完整的文件路径
+    output_file_path = os.path.join(os.getcwd(), job.output_file_path)
+    LOG.debug(output_file_path)
+
+    # 返回翻译后的文件
+    return send_file(output_file_path, as_attachment=True)
+
+
+@app.route('/translation/stream', methods=['POST'])
+def translation_stream():
+    # 文本翻译的流式接口，以 Server-Sent Events 逐段返回译文
+    params = request.get_json(silent=True) or request.form
+    text = params.get('text')
+    if not text:
+        return jsonify({'status': 'error', 'message': 'text is required'}), 400
+    source_language = params.get('source_language', 'English')
+    target_language = params.get('target_language', 'Chinese')
+
+    def events():
+        try:
+            for delta in Chain.stream(text, source_language, target_language):
+                yield f"data: {json.dumps({'delta': delta}, ensure_ascii=False)}\n\n"
+            yield "event: done\ndata: {}\n\n"
+        except Exception as e:
+            yield f"event: error\ndata: {json.dumps({'message': str(e)}, ensure_ascii=False)}\n\n"
+
+    return Response(events(), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
+
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    # Prometheus 文本格式
+    return Response(METRICS.to_prometheus(), mimetype='text/plain; version=0.0.4')
+
+
 def initialize_translator():
     # 解析命令行
     argument_parser = ArgumentParser()
     args = argument_parser.parse_arguments()
 
     # 初始化配置单例
+    global config
     config = TranslationConfig()
     config.initialize(args)    
-    # 实例化 PDFTranslator 类，并调用 translate_pdf() 方法
-    global Translator
-    Translator = PDFTranslator(config.model_name)
+
+    # 初始化持久化翻译缓存，--no_cache 时跳过
+    cache = None if config.no_cache else TranslationCache(config.cache_file, config.cache_max_entries)
+
+    # 每个任务使用独立的 PDFTranslator 实例，任务之间互不干扰
+    def translator_factory():
+        return PDFTranslator(config.model_name,
+                             max_workers=config.max_workers,
+                             cache=cache,
+                             pack_token_budget=config.pack_token_budget,
+                             stream_window=config.stream_window,
+                             parse_workers=config.parse_workers,
+                             journal_dir=config.journal_dir,
+                             resume=config.resume,
+                             render_workers=config.render_workers,
+                             dedupe_boilerplate=config.dedupe_boilerplate)
+
+    global Jobs
+    Jobs = JobManager(translator_factory, workers=config.job_workers, queue_depth=config.job_queue_depth)
+
+    # 流式文本翻译接口共用一个 TranslationChain
+    global Chain
+    Chain = TranslationChain(config.model_name)
 
 
 if __name__ == "__main__":
     # 初始化 translator
     initialize_translator()
     # 启动 Flask Web Server
-    app.run(host="0.0.0.0", port=5000, debug=True)
\ No newline at end of file
+    app.run(host="0.0.0.0", port=5000, debug=True)
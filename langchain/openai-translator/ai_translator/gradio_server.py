@@ -1,24 +1,65 @@
 import sys
 import os
+import queue
+import threading
 import gradio as gr
 
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from utils import ArgumentParser, LOG
-from translator import PDFTranslator, TranslationConfig
+from translator import PDFTranslator, TranslationConfig, TranslationCache
+from translator.translation_chain import TranslationChain
 
 
 def translation(input_file, source_language, target_language):
     LOG.debug(f"[翻译任务]\n源文件: {input_file.name}\n源语言: {source_language}\n目标语言: {target_language}")
 
-    output_file_path = Translator.translate_pdf(
-        input_file.name, source_language=source_language, target_language=target_language)
+    # 每个用户的任务使用独立的 PDFTranslator，在后台线程中执行，按页回传进度
+    translator = translator_factory()
+    events = queue.Queue()
 
-    return output_file_path
+    def on_progress(done_pages, total_pages, page_idx, page):
+        events.put(("page", done_pages, total_pages, page_idx, translator.writer.render_markdown_page(page)))
+
+    def run():
+        try:
+            output_file_path = translator.translate_pdf(
+                input_file.name, source_language=source_language, target_language=target_language,
+                progress_callback=on_progress)
+            events.put(("done", output_file_path))
+        except Exception as e:
+            LOG.error(f"翻译任务失败: {e}")
+            events.put(("error", str(e)))
+
+    threading.Thread(target=run, daemon=True).start()
+
+    translated_pages = {}
+    while True:
+        event = events.get()
+        if event[0] == "page":
+            _, done_pages, total_pages, page_idx, page_text = event
+            translated_pages[page_idx] = page_text
+            partial_text = "---\n\n".join(translated_pages[idx] for idx in sorted(translated_pages))
+            yield None, f"已完成 {done_pages}/{total_pages} 页", partial_text
+        elif event[0] == "done":
+            yield event[1], "翻译完成", "---\n\n".join(translated_pages[idx] for idx in sorted(translated_pages))
+            return
+        else:
+            raise gr.Error(f"翻译失败: {event[1]}")
+
+def text_translation(text, source_language, target_language):
+    # 流式翻译文本，每收到一段译文就刷新输出框
+    translated = ""
+    try:
+        for delta in chain.stream(text, source_language, target_language):
+            translated += delta
+            yield translated
+    except Exception as e:
+        raise gr.Error(f"翻译失败: {e}")
 
 def launch_gradio():
 
-    iface = gr.Interface(
+    pdf_iface = gr.Interface(
         fn=translation,
         title="OpenAI-Translator v2.0(PDF 电子书翻译工具)",
         inputs=[
@@ -27,11 +68,31 @@ def launch_gradio():
             gr.Textbox(label="目标语言（默认：中文）", placeholder="Chinese", value="Chinese")
         ],
         outputs=[
-            gr.File(label="下载翻译文件")
+            gr.File(label="下载翻译文件"),
+            gr.Textbox(label="翻译进度"),
+            gr.Markdown(label="已翻译内容")
         ],
         allow_flagging="never"
     )
 
+    text_iface = gr.Interface(
+        fn=text_translation,
+        title="OpenAI-Translator v2.0(文本翻译)",
+        inputs=[
+            gr.Textbox(label="待翻译文本", lines=8),
+            gr.Textbox(label="源语言（默认：英文）", placeholder="English", value="English"),
+            gr.Textbox(label="目标语言（默认：中文）", placeholder="Chinese", value="Chinese")
+        ],
+        outputs=[
+            gr.Textbox(label="译文", lines=8)
+        ],
+        allow_flagging="never"
+    )
+
+    iface = gr.TabbedInterface([pdf_iface, text_iface], ["PDF 翻译", "文本翻译"])
+
+    # 限制同时执行的翻译任务数，超出的请求在有界队列中排队
+    iface.queue(default_concurrency_limit=config.gradio_concurrency, max_size=config.gradio_queue_size)
     iface.launch(share=True, server_name="0.0.0.0")
 
 def initialize_translator():
@@ -40,11 +101,30 @@ def initialize_translator():
     args = argument_parser.parse_arguments()
 
     # 初始化配置单例
+    global config
     config = TranslationConfig()
     config.initialize(args)    
-    # 实例化 PDFTranslator 类，并调用 translate_pdf() 方法
-    global Translator
-    Translator = PDFTranslator(config.model_name)
+
+    # 初始化持久化翻译缓存，--no_cache 时跳过
+    cache = None if config.no_cache else TranslationCache(config.cache_file, config.cache_max_entries)
+
+    # 文本翻译共用一个 TranslationChain
+    global chain
+    chain = TranslationChain(config.model_name)
+
+    # 每个任务使用独立的 PDFTranslator 实例，任务之间互不干扰
+    global translator_factory
+    def translator_factory():
+        return PDFTranslator(config.model_name,
+                             max_workers=config.max_workers,
+                             cache=cache,
+                             pack_token_budget=config.pack_token_budget,
+                             stream_window=config.stream_window,
+                             parse_workers=config.parse_workers,
+                             journal_dir=config.journal_dir,
+                             resume=config.resume,
+                             render_workers=config.render_workers,
+                             dedupe_boilerplate=config.dedupe_boilerplate)
 
 
 if __name__ == "__main__":
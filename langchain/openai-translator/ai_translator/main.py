@@ -1,10 +1,12 @@
 import sys
 import os
+import json
 
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from utils import ArgumentParser, LOG
-from translator import PDFTranslator, TranslationConfig
+from utils import ArgumentParser, LOG, METRICS
+from translator import PDFTranslator, TranslationConfig, TranslationCache, PreviousEdition
+from translator.rate_limiter import RateLimiter
 
 if __name__ == "__main__":
     # 解析命令行
@@ -15,6 +17,40 @@ if __name__ == "__main__":
     config = TranslationConfig()
     config.initialize(args)    
 
+    # 初始化持久化翻译缓存，--no_cache 时跳过
+    cache = None if config.no_cache else TranslationCache(config.cache_file, config.cache_max_entries)
+
+    # 增量翻译：加载上一版本的任务日志
+    previous_edition = PreviousEdition.from_journal(config.previous_journal) if config.previous_journal else None
+
+    # 按 rpm/tpm 限流，多语言模式下所有语言共用同一份额度
+    rate_limiter = RateLimiter(config.rpm, config.tpm) if config.rpm or config.tpm else None
+
     # 实例化 PDFTranslator 类，并调用 translate_pdf() 方法
-    translator = PDFTranslator(config.model_name)
-    translator.translate_pdf(config.input_file, config.output_file_format, pages=None)
+    translator = PDFTranslator(config.model_name,
+                               max_workers=config.max_workers,
+                               cache=cache,
+                               pack_token_budget=config.pack_token_budget,
+                               stream_window=config.stream_window,
+                               parse_workers=config.parse_workers,
+                               journal_dir=config.journal_dir,
+                               resume=config.resume,
+                               render_workers=config.render_workers,
+                               dedupe_boilerplate=config.dedupe_boilerplate,
+                               previous_edition=previous_edition,
+                               rate_limiter=rate_limiter)
+    if config.target_languages:
+        # 解析一次，同时输出多种语言
+        output_file_paths = translator.translate_pdf_multi(config.input_file, config.output_file_format,
+                                                           config.source_language, config.target_languages)
+        LOG.info(f"多语言翻译完成: {output_file_paths}")
+        output_file_path = next(iter(output_file_paths.values()), None)
+    else:
+        output_file_path = translator.translate_pdf(config.input_file, config.output_file_format, pages=None)
+
+    # 输出本次任务的耗时、token 用量、重试和缓存命中汇总
+    summary = METRICS.summary()
+    summary_file_path = os.path.splitext(output_file_path or config.input_file)[0] + "_metrics.json"
+    with open(summary_file_path, "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2, ensure_ascii=False)
+    LOG.info(f"任务指标已保存至: {summary_file_path}")
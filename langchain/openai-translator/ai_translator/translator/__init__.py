@@ -1,2 +1,4 @@
 from .pdf_translator import PDFTranslator
-from .translation_config import TranslationConfig
\ No newline at end of file
+from .translation_cache import TranslationCache
+from .translation_config import TranslationConfig
+from .incremental import PreviousEdition
\ No newline at end of file
@@ -0,0 +1,108 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional
+
+from translator.pdf_parser import PDFParser
+from utils import LOG, METRICS
+
+
+def collect_books(input_dir: Optional[str] = None, manifest: Optional[str] = None) -> List[str]:
+    """从目录或清单文件收集待翻译的 PDF，清单每行一个路径，# 开头为注释。"""
+    books = []
+    if input_dir:
+        for root, _, files in os.walk(input_dir):
+            books.extend(os.path.join(root, name) for name in sorted(files)
+                         if name.lower().endswith(".pdf") and not name.endswith("_translated.pdf"))
+    if manifest:
+        manifest_dir = os.path.dirname(os.path.abspath(manifest))
+        with open(manifest, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith("#"):
+                    books.append(line if os.path.isabs(line) else os.path.join(manifest_dir, line))
+    # 去掉重复的路径，保持原有顺序
+    return list(dict.fromkeys(books))
+
+
+class BatchTranslator:
+    """批量翻译多本书：所有书共享一个有界线程池和限流器，小书优先调度。"""
+
+    def __init__(self, translator_factory: Callable, max_workers: int = 4, book_workers: int = 2):
+        # translator_factory(executor) 返回一个使用共享线程池的 PDFTranslator
+        self.translator_factory = translator_factory
+        self.max_workers = max(1, max_workers)
+        self.book_workers = max(1, book_workers)
+        self.pdf_parser = PDFParser()
+
+    def _schedule(self, books: List[str]):
+        """按页数从小到大排序，避免大量小书排在一本大书后面等待。"""
+        sizes = {}
+        for book in books:
+            try:
+                sizes[book] = self.pdf_parser.count_pages(book)
+            except Exception as e:
+                LOG.error(f"无法读取 {book}: {e}")
+                sizes[book] = None
+        return sorted(books, key=lambda book: (sizes[book] is None, sizes[book] or 0)), sizes
+
+    def translate_books(self, books: List[str], output_file_format: str = "markdown",
+                        source_language: str = "English", target_language: str = "Chinese") -> dict:
+        ordered, sizes = self._schedule(books)
+        LOG.info(f"批量翻译 {len(ordered)} 本书，共享 {self.max_workers} 个翻译线程，同时处理 {self.book_workers} 本")
+
+        reports = {}
+        reports_lock = threading.Lock()
+        start_time = time.perf_counter()
+
+        # 书级线程只负责解析和调度，真正的模型请求都提交到共享线程池，
+        # 两个池分开可以避免书级任务占满共享线程池导致死锁
+        with ThreadPoolExecutor(max_workers=self.max_workers) as shared_executor, \
+                ThreadPoolExecutor(max_workers=self.book_workers) as book_executor:
+
+            def translate_one(book):
+                report = {"book": book, "pages": sizes[book], "status": "failed"}
+                book_start = time.perf_counter()
+                try:
+                    translator = self.translator_factory(shared_executor)
+                    report["output_file"] = translator.translate_pdf(
+                        book, output_file_format, source_language, target_language)
+                    report["status"] = "done"
+                except Exception as e:
+                    LOG.error(f"翻译 {book} 失败: {e}")
+                    report["error"] = str(e)
+                report["seconds"] = round(time.perf_counter() - book_start, 3)
+                if report["pages"] and report["status"] == "done":
+                    report["pages_per_second"] = round(report["pages"] / max(report["seconds"], 1e-9), 3)
+                METRICS.inc("batch_books_total", status=report["status"])
+                with reports_lock:
+                    reports[book] = report
+
+            list(book_executor.map(translate_one, ordered))
+
+        elapsed = time.perf_counter() - start_time
+        done = [reports[book] for book in ordered if reports[book]["status"] == "done"]
+        total_pages = sum(report["pages"] or 0 for report in done)
+        summary = {
+            "books": len(ordered),
+            "succeeded": len(done),
+            "failed": len(ordered) - len(done),
+            "pages": total_pages,
+            "seconds": round(elapsed, 3),
+            "pages_per_second": round(total_pages / max(elapsed, 1e-9), 3),
+            "books_per_minute": round(len(done) * 60 / max(elapsed, 1e-9), 3),
+        }
+        LOG.info(f"批量翻译完成: {summary['succeeded']}/{summary['books']} 本成功，{total_pages} 页，"
+                 f"耗时 {elapsed:.2f} 秒，{summary['pages_per_second']} 页/秒")
+        return {"summary": summary, "books": [reports[book] for book in ordered]}
+
+    @staticmethod
+    def save_report(report: dict, report_path: str):
+        report_dir = os.path.dirname(report_path)
+        if report_dir and not os.path.exists(report_dir):
+            os.makedirs(report_dir)
+        with open(report_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        LOG.info(f"批量翻译报告已保存至: {report_path}")
@@ -0,0 +1,81 @@
+from collections import Counter
+from book import Book, Content, ContentType
+from utils import LOG
+
+
+class BoilerplateDetector:
+    """找出在多页重复出现的页眉、页脚行，拆成独立的内容块，相同内容只需翻译一次。"""
+
+    def __init__(self, min_pages: int = 3, min_page_ratio: float = 0.3, edge_lines: int = 3):
+        self.min_pages = min_pages
+        self.min_page_ratio = min_page_ratio
+        self.edge_lines = edge_lines
+
+    @staticmethod
+    def _line_key(line: str) -> str:
+        # 按整行精确匹配：版权行、"Chapter 1 ..." 等含数字但逐页相同的行同样算作重复行
+        return line.strip()
+
+    def _text_lines(self, content):
+        return content.original.splitlines() if content.content_type == ContentType.TEXT else []
+
+    def find_boilerplate(self, book: Book) -> set:
+        page_counts = Counter()
+        for page in book.pages:
+            edge_keys = set()
+            for content in page.contents:
+                lines = self._text_lines(content)
+                for line in lines[:self.edge_lines] + lines[-self.edge_lines:]:
+                    edge_keys.add(self._line_key(line))
+            page_counts.update(edge_keys)
+
+        threshold = max(self.min_pages, self.min_page_ratio * len(book.pages))
+        return {key for key, count in page_counts.items() if key and count >= threshold}
+
+    def split_boilerplate(self, book: Book) -> int:
+        """把每页文本开头和结尾的重复行拆成单独的 Content，返回新增的内容块数量。"""
+        boilerplate = self.find_boilerplate(book)
+        if not boilerplate:
+            return 0
+
+        added = 0
+        for page in book.pages:
+            new_contents = []
+            for content in page.contents:
+                lines = self._text_lines(content)
+                if not lines:
+                    new_contents.append(content)
+                    continue
+
+                def repeated(line):
+                    return self._line_key(line) in boilerplate
+
+                # 页眉区到开头 edge_lines 行中最后一个重复行为止，页脚区从末尾 edge_lines 行中第一个重复行开始
+                head = max((idx + 1 for idx in range(min(self.edge_lines, len(lines))) if repeated(lines[idx])), default=0)
+                tail = min((idx for idx in range(max(head, len(lines) - self.edge_lines), len(lines)) if repeated(lines[idx])),
+                           default=len(lines))
+
+                if head == 0 and tail == len(lines):
+                    new_contents.append(content)
+                    continue
+
+                # 夹在重复行之间、每页不同的行（如 "Page 3"）移回正文，重复行仍拆出来共享译文；
+                # 单独拆成块会让每页多出一个请求
+                header = [line for line in lines[:head] if repeated(line)]
+                footer = [line for line in lines[tail:] if repeated(line)]
+                body = [line for line in lines[:head] if not repeated(line)] + lines[head:tail] + \
+                       [line for line in lines[tail:] if not repeated(line)]
+
+                if header:
+                    new_contents.append(Content(ContentType.TEXT, "\n".join(header)))
+                    added += 1
+                if any(line.strip() for line in body):
+                    content.original = "\n".join(body)
+                    new_contents.append(content)
+                if footer:
+                    new_contents.append(Content(ContentType.TEXT, "\n".join(footer)))
+                    added += 1
+            page.contents = new_contents
+
+        LOG.info(f"识别出 {len(boilerplate)} 种重复的页眉页脚行，拆分出 {added} 个内容块")
+        return added
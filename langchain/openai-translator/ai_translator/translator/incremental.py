@@ -0,0 +1,84 @@
+import difflib
+
+from collections import defaultdict
+from book import Book, ContentType
+from translator.translation_journal import TranslationJournal
+from utils import LOG, METRICS
+
+
+class PreviousEdition:
+    """上一版本的原文指纹和译文，用于新版本只翻译改动过的内容块。"""
+
+    def __init__(self, page_fingerprints, translations):
+        # page_fingerprints: 每页内容块指纹的列表；translations: 指纹 -> 译文
+        self.page_fingerprints = [tuple(page) for page in page_fingerprints]
+        self.translations = translations
+        self.reused = 0
+
+    @classmethod
+    def from_journal(cls, journal_path: str) -> "PreviousEdition":
+        """从上一版本翻译任务的日志加载，日志的 key 是 "页:块"。"""
+        pages = defaultdict(dict)
+        translations = {}
+        for key, entry in TranslationJournal.load(journal_path).items():
+            page_idx, content_idx = map(int, key.split(":"))
+            pages[page_idx][content_idx] = entry["fingerprint"]
+            translations[entry["fingerprint"]] = entry["translation"]
+
+        page_fingerprints = [
+            [page[content_idx] for content_idx in sorted(page)] for _, page in sorted(pages.items())
+        ]
+        LOG.info(f"从 {journal_path} 加载上一版本: {len(page_fingerprints)} 页，{len(translations)} 个唯一内容块")
+        return cls(page_fingerprints, translations)
+
+    @classmethod
+    def from_book(cls, book: Book) -> "PreviousEdition":
+        """从已翻译的上一版本 Book 构建，只收录翻译成功的内容块。"""
+        page_fingerprints, translations = [], {}
+        for page in book.pages:
+            fingerprints = []
+            for content in page.contents:
+                if not content.status or content.translation is None:
+                    continue
+                if content.content_type == ContentType.TEXT:
+                    translation = content.translation
+                elif content.content_type == ContentType.TABLE:
+                    # 还原成模型返回的表格格式，重新 set_translation 时可以直接解析
+                    translation = " ".join(f"[{', '.join(row)}]" for row in content.translation)
+                else:
+                    continue
+                fingerprint = TranslationJournal.fingerprint(content)
+                fingerprints.append(fingerprint)
+                translations[fingerprint] = translation
+            page_fingerprints.append(fingerprints)
+        return cls(page_fingerprints, translations)
+
+    def lookup(self, content):
+        translation = self.translations.get(TranslationJournal.fingerprint(content))
+        if translation is not None:
+            self.reused += 1
+            METRICS.inc("incremental_reused_blocks_total")
+        return translation
+
+    def diff_pages(self, book: Book) -> dict:
+        """按页指纹对齐新旧版本，统计未改动、改动、新增和删除的页。"""
+        new_pages = [tuple(TranslationJournal.fingerprint(content) for content in page.contents) for page in book.pages]
+        matcher = difflib.SequenceMatcher(None, self.page_fingerprints, new_pages, autojunk=False)
+
+        report = {"unchanged": 0, "changed": 0, "added": 0, "removed": 0}
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag == "equal":
+                report["unchanged"] += j2 - j1
+            elif tag == "replace":
+                changed = min(i2 - i1, j2 - j1)
+                report["changed"] += changed
+                report["added"] += (j2 - j1) - changed
+                report["removed"] += (i2 - i1) - changed
+            elif tag == "insert":
+                report["added"] += j2 - j1
+            elif tag == "delete":
+                report["removed"] += i2 - i1
+
+        LOG.info(f"与上一版本对比: 未改动 {report['unchanged']} 页，改动 {report['changed']} 页，"
+                 f"新增 {report['added']} 页，删除 {report['removed']} 页")
+        return report
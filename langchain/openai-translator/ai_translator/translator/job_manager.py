@@ -0,0 +1,110 @@
+import queue
+import threading
+import time
+import uuid
+
+from collections import OrderedDict
+from typing import Callable, Optional
+from utils import LOG
+
+
+class QueueFullException(Exception):
+    def __init__(self, queue_depth):
+        self.queue_depth = queue_depth
+        super().__init__(f"Translation queue is full: {queue_depth} jobs are already waiting.")
+
+
+class TranslationJob:
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+    def __init__(self, input_file: str, source_language: str, target_language: str, output_file_format: str):
+        self.job_id = uuid.uuid4().hex
+        self.input_file = input_file
+        self.source_language = source_language
+        self.target_language = target_language
+        self.output_file_format = output_file_format
+        self.status = self.QUEUED
+        self.done_pages = 0
+        self.total_pages = None
+        self.output_file_path = None
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+
+    def on_progress(self, done_pages, total_pages, page_idx, page):
+        self.done_pages = done_pages
+        self.total_pages = total_pages
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "progress": {
+                "done_pages": self.done_pages,
+                "total_pages": self.total_pages,
+            },
+            "error": self.error,
+        }
+
+
+class JobManager:
+    """有界队列 + 固定数量的工作线程，每个任务使用独立的 PDFTranslator 实例。"""
+
+    def __init__(self, translator_factory: Callable, workers: int = 2, queue_depth: int = 16,
+                 max_finished_jobs: int = 1000):
+        self.translator_factory = translator_factory
+        self.queue_depth = queue_depth
+        self.max_finished_jobs = max_finished_jobs
+        self._queue = queue.Queue(maxsize=queue_depth)
+        self._jobs = OrderedDict()
+        self._jobs_lock = threading.Lock()
+
+        for i in range(max(1, workers)):
+            threading.Thread(target=self._worker, name=f"translation-worker-{i}", daemon=True).start()
+
+    def submit(self, job: TranslationJob) -> TranslationJob:
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            raise QueueFullException(self.queue_depth)
+        with self._jobs_lock:
+            self._jobs[job.job_id] = job
+            self._prune_finished_jobs()
+        LOG.info(f"任务 {job.job_id} 已加入队列，当前排队 {self._queue.qsize()} 个")
+        return job
+
+    def get(self, job_id: str) -> Optional[TranslationJob]:
+        with self._jobs_lock:
+            return self._jobs.get(job_id)
+
+    def _prune_finished_jobs(self):
+        # 只保留最近的若干个已结束任务，避免任务表无限增长
+        finished = [job_id for job_id, job in self._jobs.items()
+                    if job.status in (TranslationJob.DONE, TranslationJob.FAILED)]
+        for job_id in finished[:max(0, len(finished) - self.max_finished_jobs)]:
+            del self._jobs[job_id]
+
+    def _worker(self):
+        while True:
+            job = self._queue.get()
+            job.status = TranslationJob.RUNNING
+            LOG.info(f"开始执行任务 {job.job_id}: {job.input_file}")
+            try:
+                translator = self.translator_factory()
+                job.output_file_path = translator.translate_pdf(
+                    job.input_file,
+                    job.output_file_format,
+                    source_language=job.source_language,
+                    target_language=job.target_language,
+                    progress_callback=job.on_progress)
+                job.status = TranslationJob.DONE
+            except Exception as e:
+                LOG.error(f"任务 {job.job_id} 失败: {e}")
+                job.error = str(e)
+                job.status = TranslationJob.FAILED
+            finally:
+                job.finished_at = time.time()
+                self._queue.task_done()
@@ -1,58 +1,116 @@
-import pdfplumber
-from typing import Optional
+import math
+from typing import Iterator, List, Optional
 from book import Book, Page, Content, ContentType, TableContent
 from translator.exceptions import PageOutOfRangeException
-from utils import LOG
+from utils import LOG, METRICS
 
 
 class PDFParser:
-    def __init__(self):
-        pass
+    def __init__(self, workers: int = 1):
+        self.workers = max(1, workers)
 
     def parse_pdf(self, pdf_file_path: str, pages: Optional[int] = None) -> Book:
         book = Book(pdf_file_path)
 
+        for page in self.iter_pages(pdf_file_path, pages):
+            book.add_page(page)
+
+        return book
+
+    def count_pages(self, pdf_file_path: str, pages: Optional[int] = None) -> int:
+        import pdfplumber
+
         with pdfplumber.open(pdf_file_path) as pdf:
-            if pages is not None and pages > len(pdf.pages):
-                raise PageOutOfRangeException(len(pdf.pages), pages)
+            total_pages = len(pdf.pages)
+        return total_pages if pages is None else min(pages, total_pages)
 
-            if pages is None:
-                pages_to_parse = pdf.pages
-            else:
-                pages_to_parse = pdf.pages[:pages]
+    def iter_pages(self, pdf_file_path: str, pages: Optional[int] = None) -> Iterator[Page]:
+        """逐页解析 PDF，每解析完一页就立即返回，内存占用与页数无关。"""
+        import pdfplumber
 
-            for pdf_page in pages_to_parse:
-                page = Page()
+        with pdfplumber.open(pdf_file_path) as pdf:
+            total_pages = len(pdf.pages)
+            if pages is not None and pages > total_pages:
+                raise PageOutOfRangeException(total_pages, pages)
 
-                # Store the original text content
-                raw_text = pdf_page.extract_text()
-                tables = pdf_page.extract_tables()
+            page_count = total_pages if pages is None else pages
 
-                # Remove each cell's content from the original text
-                for table_data in tables:
-                    for row in table_data:
-                        for cell in row:
-                            raw_text = raw_text.replace(cell, "", 1)
+            if self.workers == 1:
+                for pdf_page in pdf.pages[:page_count]:
+                    yield self.parse_page(pdf_page)
 
-                # Handling text
-                if raw_text:
-                    # Remove empty lines and leading/trailing whitespaces
-                    raw_text_lines = raw_text.splitlines()
-                    cleaned_raw_text_lines = [line.strip() for line in raw_text_lines if line.strip()]
-                    cleaned_raw_text = "\n".join(cleaned_raw_text_lines)
+                    # 释放 pdfplumber 为该页缓存的对象
+                    pdf_page.flush_cache()
+                return
 
-                    text_content = Content(content_type=ContentType.TEXT, original=cleaned_raw_text)
-                    page.add_content(text_content)
-                    LOG.debug(f"[raw_text]\n {cleaned_raw_text}")
+        yield from self._iter_pages_parallel(pdf_file_path, page_count)
 
+    def _iter_pages_parallel(self, pdf_file_path: str, page_count: int) -> Iterator[Page]:
+        from concurrent.futures import ProcessPoolExecutor
 
+        # 每个进程分到若干段页码，段数多于进程数以平衡各页解析耗时的差异
+        range_size = max(1, math.ceil(page_count / (self.workers * 4)))
+        page_ranges = [(start, min(start + range_size, page_count)) for start in range(0, page_count, range_size)]
+        LOG.debug(f"使用 {self.workers} 个进程并行解析 {page_count} 页，共 {len(page_ranges)} 段")
 
-                # Handling tables
-                if tables:
-                    table = TableContent(tables)
-                    page.add_content(table)
-                    LOG.debug(f"[table]\n{table}")
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            # executor.map 按提交顺序返回结果，合并后的页面顺序与原书一致
+            for range_pages in executor.map(_parse_page_range, [pdf_file_path] * len(page_ranges), page_ranges):
+                yield from range_pages
 
-                book.add_page(page)
+    def parse_page(self, pdf_page) -> Page:
+        with METRICS.timer("pdf_parse_page_seconds"):
+            return self._parse_page(pdf_page)
 
-        return book
+    def _parse_page(self, pdf_page) -> Page:
+        page = Page()
+
+        # 每页只检测一次表格区域，正文只从表格区域之外的字符中提取
+        found_tables = pdf_page.find_tables()
+        tables = [[["" if cell is None else cell for cell in row] for row in found_table.extract()]
+                  for found_table in found_tables]
+
+        # Store the original text content
+        if found_tables:
+            bboxes = [found_table.bbox for found_table in found_tables]
+            raw_text = pdf_page.filter(_outside_bboxes(bboxes)).extract_text()
+        else:
+            raw_text = pdf_page.extract_text()
+
+        # Handling text
+        if raw_text:
+            # Remove empty lines and leading/trailing whitespaces
+            raw_text_lines = raw_text.splitlines()
+            cleaned_raw_text_lines = [line.strip() for line in raw_text_lines if line.strip()]
+            cleaned_raw_text = "\n".join(cleaned_raw_text_lines)
+
+            text_content = Content(content_type=ContentType.TEXT, original=cleaned_raw_text)
+            page.add_content(text_content)
+            LOG.debug(f"[raw_text]\n {cleaned_raw_text}")
+
+        # Handling tables
+        if tables:
+            table = TableContent(tables)
+            page.add_content(table)
+            LOG.debug(f"[table]\n{table}")
+
+        return page
+
+
+def _parse_page_range(pdf_file_path: str, page_range) -> List[Page]:
+    """子进程入口：各进程自行打开 PDF，只解析分配到的页码段。"""
+    import pdfplumber
+
+    start, end = page_range
+    parser = PDFParser()
+    with pdfplumber.open(pdf_file_path) as pdf:
+        return [parser.parse_page(pdf_page) for pdf_page in pdf.pages[start:end]]
+
+
+def _outside_bboxes(bboxes):
+    """返回一个过滤函数：对象中心点不落在任何表格区域内时保留。"""
+    def predicate(obj):
+        x = (obj["x0"] + obj["x1"]) / 2
+        y = (obj["top"] + obj["bottom"]) / 2
+        return not any(x0 <= x <= x1 and top <= y <= bottom for x0, top, x1, bottom in bboxes)
+    return predicate
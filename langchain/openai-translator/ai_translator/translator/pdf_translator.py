@@ -1,29 +1,377 @@
-from typing import Optional
+import copy
+import hashlib
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional
 from translator.pdf_parser import PDFParser
 from translator.writer import Writer
-from translator.translation_chain import TranslationChain
-from utils import LOG
+from translator.translation_cache import TranslationCache
+from translator.translation_journal import TranslationJournal
+from translator.request_packer import RequestPacker, get_encoding
+from translator.boilerplate import BoilerplateDetector
+from translator.incremental import PreviousEdition
+from translator.rate_limiter import RateLimiter
+from utils import LOG, METRICS
 
 class PDFTranslator:
-    def __init__(self, model_name: str):
-        self.translate_chain = TranslationChain(model_name)
-        self.pdf_parser = PDFParser()
-        self.writer = Writer()
+    def __init__(self, model_name: str, max_workers: int = 1, cache: Optional[TranslationCache] = None,
+                 pack_token_budget: int = 0, stream_window: int = 0, parse_workers: int = 1,
+                 journal_dir: Optional[str] = None, resume: bool = False,
+                 translate_chain=None, render_workers: int = 1, dedupe_boilerplate: bool = False,
+                 previous_edition: Optional[PreviousEdition] = None,
+                 executor: Optional[ThreadPoolExecutor] = None, rate_limiter: Optional[RateLimiter] = None):
+        if translate_chain is None:
+            # LangChain 导入较慢，只在真正需要调用模型时才导入
+            from translator.translation_chain import TranslationChain
+            translate_chain = TranslationChain(model_name)
+        self.translate_chain = translate_chain
+        self.max_workers = max(1, max_workers)
+        self.cache = cache
+        self.packer = RequestPacker(model_name, pack_token_budget) if pack_token_budget > 0 else None
+        # stream_window > 0 时启用流式模式：每次只在内存中保留 stream_window 页
+        self.stream_window = stream_window
+        self.journal_dir = journal_dir
+        self.resume = resume
+        self.journal = None
+        self.progress_callback = None
+        self._progress_lock = threading.Lock()
+        # 跨页重复的页眉、页脚等只翻译一次
+        self.boilerplate_detector = BoilerplateDetector() if dedupe_boilerplate else None
+        self.dedupe_stats = {"boilerplate_blocks": 0, "saved_requests": 0, "saved_tokens": 0}
+        self._encoding = None
+        # 增量翻译：与上一版本指纹相同的内容块直接复用旧译文
+        self.previous_edition = previous_edition
+        # 批量模式下多本书共享同一个线程池和限流器，总并发和请求速率由它们统一控制
+        self.executor = executor
+        self.rate_limiter = rate_limiter
+        self.pdf_parser = PDFParser(parse_workers)
+        self.writer = Writer(render_workers)
 
     def translate_pdf(self,
                     input_file: str,
                     output_file_format: str = 'markdown',
                     source_language: str = "English",
                     target_language: str = 'Chinese',
-                    pages: Optional[int] = None):
-        
+                    pages: Optional[int] = None,
+                    progress_callback: Optional[Callable] = None):
+        """progress_callback(done_pages, total_pages, page_idx, page) 在每一页全部翻译完成后调用。"""
+
+        self.progress_callback = progress_callback
+        if progress_callback:
+            self._done_pages = 0
+            self._total_pages = self.pdf_parser.count_pages(input_file, pages)
+
+        if self.journal_dir:
+            self.journal = TranslationJournal(self.journal_path(input_file, target_language, output_file_format), self.resume)
+        try:
+            return self._translate_pdf(input_file, output_file_format, source_language, target_language, pages)
+        finally:
+            if self.journal:
+                self.journal.close()
+                self.journal = None
+            self.progress_callback = None
+
+    def translate_pdf_multi(self,
+                            input_file: str,
+                            output_file_format: str = 'markdown',
+                            source_language: str = "English",
+                            target_languages: List[str] = ('Chinese',),
+                            pages: Optional[int] = None) -> dict:
+        """解析一次，同时翻译成多种语言，返回 目标语言 -> 输出文件路径。
+
+        各语言共享同一个线程池和限流器，总并发和请求速率不随语言数量增加。
+        """
+        book = self.pdf_parser.parse_pdf(input_file, pages)
+        # 页眉页脚拆分会修改 Book，在复制给各语言之前只做一次
+        if self.boilerplate_detector:
+            self._split_boilerplate(book)
+        self.book = book
+        if self.previous_edition:
+            LOG.warning("多语言模式不支持增量翻译，将忽略上一版本的译文")
+
+        executor = self.executor or ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            def translate_language(target_language):
+                return target_language, self._fork(executor)._translate_language(
+                    book, output_file_format, source_language, target_language)
+
+            with ThreadPoolExecutor(max_workers=len(target_languages)) as language_executor:
+                outputs = dict(language_executor.map(translate_language, target_languages))
+        finally:
+            if executor is not self.executor:
+                executor.shutdown()
+        return outputs
+
+    def _fork(self, executor: ThreadPoolExecutor) -> "PDFTranslator":
+        # 共享模型链、缓存、线程池和限流器，各自持有任务日志和统计
+        translator = copy.copy(self)
+        translator.executor = executor
+        translator.journal = None
+        translator.progress_callback = None
+        translator.boilerplate_detector = None
+        translator.previous_edition = None
+        # 页眉页脚已在父任务中拆分，每种语言都要为拆出的块付出同样的代价
+        translator.dedupe_stats = {"boilerplate_blocks": self.dedupe_stats["boilerplate_blocks"],
+                                   "saved_requests": 0, "saved_tokens": 0}
+        return translator
+
+    def _translate_language(self, book, output_file_format: str, source_language: str, target_language: str) -> str:
+        translated_book = book.copy_untranslated()
+        if self.journal_dir:
+            self.journal = TranslationJournal(self.journal_path(book.pdf_file_path, target_language, output_file_format), self.resume)
+        try:
+            LOG.info(f"开始翻译为 {target_language}")
+            self.translate_book(translated_book, source_language, target_language)
+        finally:
+            if self.journal:
+                self.journal.close()
+                self.journal = None
+
+        extension = "pdf" if output_file_format.lower() == "pdf" else "md"
+        output_file_path = os.path.splitext(book.pdf_file_path)[0] + f"_translated.{target_language}.{extension}"
+        return self.writer.save_translated_book(translated_book, output_file_format, output_file_path)
+
+    def journal_path(self, input_file: str, target_language: str, output_file_format: str = 'markdown') -> str:
+        # 按文件内容的摘要、目标语言和输出格式区分，重新提交同一个文件（包括服务端重新上传）都能找到原来的日志用于续翻
+        book_name = os.path.splitext(os.path.basename(input_file))[0]
+        return os.path.join(self.journal_dir, f"{book_name}.{self._file_digest(input_file)}.{target_language}.{output_file_format.lower()}.jsonl")
+
+    @staticmethod
+    def _file_digest(input_file: str) -> str:
+        digest = hashlib.sha1()
+        with open(input_file, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        return digest.hexdigest()[:12]
+
+    def _translate_pdf(self, input_file: str, output_file_format: str, source_language: str, target_language: str,
+                       pages: Optional[int]):
+        if self.stream_window > 0:
+            if output_file_format.lower() == "markdown":
+                return self._translate_pdf_streaming(input_file, source_language, target_language, pages)
+            LOG.warning(f"流式模式仅支持 Markdown 导出，{output_file_format} 将使用整本翻译模式")
+
         self.book = self.pdf_parser.parse_pdf(input_file, pages)
+        self.translate_book(self.book, source_language, target_language)
 
-        for page_idx, page in enumerate(self.book.pages):
-            for content_idx, content in enumerate(page.contents):
-                # Translate content.original
-                translation, status = self.translate_chain.run(content, source_language, target_language)
-                # Update the content in self.book.pages directly
-                self.book.pages[page_idx].contents[content_idx].set_translation(translation, status)
-        
         return self.writer.save_translated_book(self.book, output_file_format)
+
+    def translate_book(self, book, source_language: str = "English", target_language: str = 'Chinese') -> int:
+        """翻译一本已解析的书，译文直接写回各个 Content，返回内容块数量。"""
+        start_time = time.perf_counter()
+        if self.boilerplate_detector:
+            self._split_boilerplate(book)
+        if self.previous_edition:
+            self.previous_edition.diff_pages(book)
+        # 设置了 stream_window 时按窗口分批提交，共享线程池中的多本书可以交替推进
+        window = self.stream_window if self.stream_window > 0 else len(book.pages) or 1
+        block_count = 0
+        for first_page_idx in range(0, len(book.pages), window):
+            block_count += self._translate_pages(book.pages[first_page_idx:first_page_idx + window],
+                                                 source_language, target_language, first_page_idx)
+        self._log_throughput(block_count, time.perf_counter() - start_time)
+        return block_count
+
+    def _translate_pdf_streaming(self, input_file: str, source_language: str, target_language: str, pages: Optional[int]):
+        self.book = None
+        block_count = 0
+        start_time = time.perf_counter()
+
+        def translated_pages():
+            nonlocal block_count
+            window, first_page_idx = [], 0
+            for page in self.pdf_parser.iter_pages(input_file, pages):
+                window.append(page)
+                if len(window) >= self.stream_window:
+                    block_count += self._translate_pages(window, source_language, target_language, first_page_idx)
+                    yield from window
+                    first_page_idx += len(window)
+                    window = []
+            if window:
+                block_count += self._translate_pages(window, source_language, target_language, first_page_idx)
+                yield from window
+
+        output_file_path = self.writer.save_translated_pages_markdown(input_file, translated_pages())
+        self._log_throughput(block_count, time.perf_counter() - start_time)
+        return output_file_path
+
+    def _translate_pages(self, pages, source_language: str, target_language: str, first_page_idx: int = 0) -> int:
+        contents, keys, content_pages = [], [], []
+        for page_idx, page in enumerate(pages, start=first_page_idx):
+            for content_idx, content in enumerate(page.contents):
+                contents.append(content)
+                keys.append(f"{page_idx}:{content_idx}")
+                content_pages.append(page_idx - first_page_idx)
+
+        remaining = [len(page.contents) for page in pages]
+        remaining_lock = threading.Lock()
+
+        def on_result(idx, translation, status):
+            # Update the content in the pages directly
+            contents[idx].set_translation(translation, status)
+            page_pos = content_pages[idx]
+            with remaining_lock:
+                remaining[page_pos] -= 1
+                page_finished = remaining[page_pos] == 0
+            if page_finished:
+                self._notify_page_done(first_page_idx + page_pos, pages[page_pos])
+
+        for page_pos, page in enumerate(pages):
+            if not page.contents:
+                self._notify_page_done(first_page_idx + page_pos, page)
+
+        self._translate_contents(contents, source_language, target_language, keys, on_result)
+        return len(contents)
+
+    def _notify_page_done(self, page_idx: int, page):
+        if not self.progress_callback:
+            return
+        with self._progress_lock:
+            self._done_pages += 1
+            done_pages = self._done_pages
+        self.progress_callback(done_pages, self._total_pages, page_idx, page)
+
+    def _log_throughput(self, block_count: int, elapsed: float):
+        METRICS.inc("translated_blocks_total", block_count)
+        METRICS.observe("translate_job_seconds", elapsed)
+        LOG.info(f"翻译了 {block_count} 个内容块，耗时 {elapsed:.2f} 秒，吞吐量 {block_count / max(elapsed, 1e-9):.2f} blocks/s (max_workers={self.max_workers})")
+        if self.cache:
+            self.cache.log_stats()
+        if self.previous_edition:
+            LOG.info(f"增量翻译: 复用上一版本 {self.previous_edition.reused} 个内容块的译文")
+        if self.dedupe_stats["saved_requests"] or self.dedupe_stats["boilerplate_blocks"]:
+            # 拆分页眉页脚会新增内容块，净节省 = 去重跳过的块 - 拆分新增的块，可能为负
+            net_saved = self.dedupe_stats["saved_requests"] - self.dedupe_stats["boilerplate_blocks"]
+            LOG.info(f"去重: 拆分页眉页脚新增 {self.dedupe_stats['boilerplate_blocks']} 个内容块，"
+                     f"重复内容跳过 {self.dedupe_stats['saved_requests']} 个，净{'节省' if net_saved >= 0 else '增加'} "
+                     f"{abs(net_saved)} 个内容块请求，节省约 {self.dedupe_stats['saved_tokens']} 个 token")
+
+    def _translate_contents(self, contents, source_language: str, target_language: str, keys=None, on_result=None):
+        results = [None] * len(contents)
+
+        def deliver(idx, translation, status):
+            results[idx] = (translation, status)
+            if status and self.journal and keys:
+                self.journal.record(keys[idx], contents[idx], translation)
+            if on_result:
+                on_result(idx, translation, status)
+
+        # 先查任务日志，再把内容完全相同的块合并，每个唯一内容只查一次缓存、只请求一次模型
+        pending, duplicates, representatives = [], {}, {}
+        for idx, content in enumerate(contents):
+            journaled = self.journal.lookup(keys[idx], content) if self.journal and keys else None
+            if journaled is not None:
+                results[idx] = (journaled, True)
+                if on_result:
+                    on_result(idx, journaled, True)
+                continue
+
+            dedupe_key = (content.content_type, str(content))
+            if dedupe_key in representatives:
+                duplicates[representatives[dedupe_key]].append(idx)
+                continue
+            representatives[dedupe_key] = idx
+            duplicates[idx] = []
+
+            cached = self.previous_edition.lookup(content) if self.previous_edition else None
+            if cached is None:
+                cached = self._get_cached(content, source_language, target_language)
+            if cached is not None:
+                deliver(idx, cached, True)
+            else:
+                pending.append(idx)
+
+        # 缓存命中的代表块已有结果，直接分发给重复块
+        for rep_idx, dup_idxs in duplicates.items():
+            if results[rep_idx] is not None:
+                for dup_idx in dup_idxs:
+                    deliver(dup_idx, *results[rep_idx])
+        self._record_dedupe_savings(contents, [dup_idx for rep_idx in pending for dup_idx in duplicates[rep_idx]])
+
+        if self.packer:
+            batches = [[pending[i] for i in batch] for batch in self.packer.pack([contents[idx] for idx in pending])]
+        else:
+            batches = [[idx] for idx in pending]
+        LOG.debug(f"{len(pending)} 个内容块需要翻译，共 {len(batches)} 次请求")
+
+        def translate_batch(batch):
+            batch_result = self._translate_batch([contents[idx] for idx in batch], source_language, target_language)
+            # 每个请求完成后立即写入任务日志，并把译文共享给内容相同的块
+            for idx, (translation, status) in zip(batch, batch_result):
+                for target_idx in [idx] + duplicates[idx]:
+                    deliver(target_idx, translation, status)
+            return batch_result
+
+        if self.executor:
+            list(self.executor.map(translate_batch, batches))
+        elif self.max_workers > 1:
+            # 并发调用 TranslationChain，executor.map 按提交顺序返回结果，保证页面和内容的顺序
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                list(executor.map(translate_batch, batches))
+        else:
+            for batch in batches:
+                translate_batch(batch)
+
+        return results
+
+    def _split_boilerplate(self, book):
+        added = self.boilerplate_detector.split_boilerplate(book)
+        self.dedupe_stats["boilerplate_blocks"] += added
+        METRICS.inc("dedupe_split_blocks_total", added)
+
+    def _record_dedupe_savings(self, contents, duplicate_idxs):
+        if not duplicate_idxs:
+            return
+        saved_tokens = sum(self._count_tokens(str(contents[idx])) for idx in duplicate_idxs)
+        self.dedupe_stats["saved_requests"] += len(duplicate_idxs)
+        self.dedupe_stats["saved_tokens"] += saved_tokens
+        METRICS.inc("dedupe_saved_requests_total", len(duplicate_idxs))
+        METRICS.inc("dedupe_saved_tokens_total", saved_tokens)
+
+    def _count_tokens(self, text: str) -> int:
+        if self._encoding is None:
+            self._encoding = get_encoding(self.translate_chain.model_name)
+        return len(self._encoding.encode(text))
+
+    def _translate_batch(self, batch_contents, source_language: str, target_language: str):
+        if len(batch_contents) == 1:
+            return [self._translate_content(batch_contents[0], source_language, target_language)]
+
+        packed_text = self.packer.join([str(content) for content in batch_contents])
+        translation, status = self._run_chain(packed_text, source_language, target_language)
+        parts = self.packer.split(translation, len(batch_contents)) if status else None
+        if parts is None:
+            LOG.warning(f"打包请求的返回结果无法拆分，回退为逐块翻译 {len(batch_contents)} 个内容块")
+            METRICS.inc("packed_request_fallbacks_total")
+            return [self._translate_content(content, source_language, target_language) for content in batch_contents]
+
+        for content, part in zip(batch_contents, parts):
+            self._set_cached(content, source_language, target_language, part)
+        return [(part, True) for part in parts]
+
+    def _translate_content(self, content, source_language: str, target_language: str):
+        translation, status = self._run_chain(content, source_language, target_language)
+        if status:
+            self._set_cached(content, source_language, target_language, translation)
+        return translation, status
+
+    def _run_chain(self, text, source_language: str, target_language: str):
+        if self.rate_limiter:
+            # 粗略按输入 token 的两倍估算一次请求消耗的额度（输入 + 输出）
+            self.rate_limiter.acquire(2 * self._count_tokens(str(text)) if self.rate_limiter.tpm else 0)
+        return self.translate_chain.run(text, source_language, target_language)
+
+    def _cache_key(self, content, source_language: str, target_language: str):
+        return self.cache.make_key(self.translate_chain.model_name, source_language, target_language,
+                                   self.translate_chain.template, str(content))
+
+    def _get_cached(self, content, source_language: str, target_language: str):
+        if not self.cache:
+            return None
+        return self.cache.get(self._cache_key(content, source_language, target_language))
+
+    def _set_cached(self, content, source_language: str, target_language: str, translation: str):
+        if self.cache:
+            self.cache.set(self._cache_key(content, source_language, target_language), translation)
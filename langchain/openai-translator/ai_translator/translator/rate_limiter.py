@@ -0,0 +1,59 @@
+import threading
+import time
+
+
+class RateLimiter:
+    """按每分钟请求数（RPM）和每分钟 token 数（TPM）限流的令牌桶，进程内所有翻译任务共享。"""
+
+    def __init__(self, rpm: int, tpm: int = 0):
+        # 0 表示不限制对应的额度
+        self.rpm = rpm
+        self.tpm = tpm
+        self._available_requests = float(rpm)
+        self._available_tokens = float(tpm)
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+        self.acquired = 0
+        self.total_wait_seconds = 0.0
+
+    def _refill(self, now: float):
+        elapsed = now - self._last_refill
+        self._last_refill = now
+        if self.rpm:
+            self._available_requests = min(self.rpm, self._available_requests + elapsed * self.rpm / 60)
+        if self.tpm:
+            self._available_tokens = min(self.tpm, self._available_tokens + elapsed * self.tpm / 60)
+
+    def acquire(self, tokens: int = 0):
+        # 单个请求超过桶容量时按满桶处理，否则永远等不到
+        tokens = min(tokens, self.tpm) if self.tpm else 0
+        start_time = time.monotonic()
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                requests_ok = not self.rpm or self._available_requests >= 1
+                tokens_ok = not self.tpm or self._available_tokens >= tokens
+                if requests_ok and tokens_ok:
+                    if self.rpm:
+                        self._available_requests -= 1
+                    if self.tpm:
+                        self._available_tokens -= tokens
+                    self.acquired += 1
+                    self.total_wait_seconds += now - start_time
+                    return
+                wait = max(
+                    (1 - self._available_requests) * 60 / self.rpm if self.rpm else 0,
+                    (tokens - self._available_tokens) * 60 / self.tpm if self.tpm else 0,
+                )
+            time.sleep(max(wait, 0.01))
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {
+                "rpm": self.rpm,
+                "tpm": self.tpm,
+                "acquired": self.acquired,
+                "total_wait_seconds": round(self.total_wait_seconds, 2),
+            }
@@ -0,0 +1,71 @@
+import re
+
+from typing import List, Optional
+from book import Content, ContentType
+
+BLOCK_MARKER = "<<<BLOCK {index}>>>"
+BLOCK_PATTERN = re.compile(r"<<<BLOCK (\d+)>>>\s*(.*?)\s*(?=<<<BLOCK \d+>>>|\Z)", re.DOTALL)
+
+PACK_INSTRUCTION = (
+    "The text below contains {count} independent blocks, each starting with a marker line like "
+    "<<<BLOCK n>>>. Translate every block separately and keep every marker line unchanged and in order."
+)
+
+
+def get_encoding(model_name: str):
+    import tiktoken
+
+    try:
+        return tiktoken.encoding_for_model(model_name)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
+
+class RequestPacker:
+    """将相邻的短文本块打包成一次请求，减少往返次数和重复的 System 提示词。"""
+
+    def __init__(self, model_name: str, token_budget: int = 1500, small_block_tokens: int = 300):
+        self.token_budget = token_budget
+        self.small_block_tokens = min(small_block_tokens, token_budget)
+        self.encoding = get_encoding(model_name)
+
+    def count_tokens(self, text: str) -> int:
+        return len(self.encoding.encode(str(text)))
+
+    def pack(self, contents: List[Content]) -> List[List[int]]:
+        """返回按顺序分组后的下标列表，只有连续的短文本块会被合并。"""
+        batches = []
+        current, current_tokens = [], 0
+
+        for idx, content in enumerate(contents):
+            tokens = self.count_tokens(content) if content.content_type == ContentType.TEXT else None
+            if tokens is None or tokens > self.small_block_tokens:
+                if current:
+                    batches.append(current)
+                    current, current_tokens = [], 0
+                batches.append([idx])
+                continue
+
+            if current and current_tokens + tokens > self.token_budget:
+                batches.append(current)
+                current, current_tokens = [], 0
+            current.append(idx)
+            current_tokens += tokens
+
+        if current:
+            batches.append(current)
+        return batches
+
+    def join(self, texts: List[str]) -> str:
+        blocks = [f"{BLOCK_MARKER.format(index=i)}\n{text}" for i, text in enumerate(texts, start=1)]
+        return PACK_INSTRUCTION.format(count=len(texts)) + "\n\n" + "\n\n".join(blocks)
+
+    def split(self, reply: str, count: int) -> Optional[List[str]]:
+        """按标记拆分模型返回结果，标记缺失、重复或乱序时返回 None。"""
+        matches = BLOCK_PATTERN.findall(reply)
+        if [int(index) for index, _ in matches] != list(range(1, count + 1)):
+            return None
+        parts = [text.strip() for _, text in matches]
+        if not all(parts):
+            return None
+        return parts
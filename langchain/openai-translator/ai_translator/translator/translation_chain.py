@@ -1,5 +1,10 @@
+import queue
+import threading
+import time
+
 from langchain.chat_models import ChatOpenAI
 from langchain.chains import LLMChain
+from langchain.callbacks.base import BaseCallbackHandler
 
 from langchain.prompts.chat import (
     ChatPromptTemplate,
@@ -7,16 +12,44 @@ from langchain.prompts.chat import (
     HumanMessagePromptTemplate,
 )
 
-from utils import LOG
+from utils import LOG, METRICS
+
+
+class MetricsCallbackHandler(BaseCallbackHandler):
+    """把 LLM 调用的 token 用量和重试次数记录到 METRICS。"""
+
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+
+    def on_llm_end(self, response, **kwargs):
+        token_usage = (response.llm_output or {}).get("token_usage", {})
+        METRICS.inc("llm_prompt_tokens_total", token_usage.get("prompt_tokens", 0), model=self.model_name)
+        METRICS.inc("llm_completion_tokens_total", token_usage.get("completion_tokens", 0), model=self.model_name)
+
+    def on_retry(self, retry_state, **kwargs):
+        METRICS.inc("llm_retries_total", model=self.model_name)
+
+
+class StreamingCallbackHandler(BaseCallbackHandler):
+    """把流式输出的每个 token 放进队列，由 TranslationChain.stream 逐个取出。"""
+
+    def __init__(self, tokens: queue.Queue):
+        self.tokens = tokens
+
+    def on_llm_new_token(self, token: str, **kwargs):
+        self.tokens.put(token)
+
 
 class TranslationChain:
     def __init__(self, model_name: str = "gpt-3.5-turbo", verbose: bool = True):
-        
+        self.model_name = model_name
+
         # 翻译任务指令始终由 System 角色承担
         template = (
             """You are a translation expert, proficient in various languages. \n
             Translates {source_language} to {target_language}."""
         )
+        self.template = template
         system_message_prompt = SystemMessagePromptTemplate.from_template(template)
 
         # 待翻译文本由 Human 角色输入
@@ -32,17 +65,63 @@ class TranslationChain:
         chat = ChatOpenAI(model_name=model_name, temperature=0, verbose=verbose)
 
         self.chain = LLMChain(llm=chat, prompt=chat_prompt_template, verbose=verbose)
+        self.callbacks = [MetricsCallbackHandler(model_name)]
+
+        # 流式输出使用单独的 LLM 实例，非流式的 run() 保持不变
+        streaming_chat = ChatOpenAI(model_name=model_name, temperature=0, verbose=verbose, streaming=True)
+        self.streaming_chain = LLMChain(llm=streaming_chat, prompt=chat_prompt_template, verbose=verbose)
 
     def run(self, text: str, source_language: str, target_language: str) -> (str, bool):
         result = ""
+        start_time = time.perf_counter()
         try:
             result = self.chain.run({
                 "text": text,
                 "source_language": source_language,
                 "target_language": target_language,
-            })
+            }, callbacks=self.callbacks)
         except Exception as e:
             LOG.error(f"An error occurred during translation: {e}")
+            METRICS.inc("llm_request_errors_total", model=self.model_name)
             return result, False
+        finally:
+            METRICS.observe("llm_request_seconds", time.perf_counter() - start_time, model=self.model_name)
+
+        return result, True
+
+    def stream(self, text: str, source_language: str, target_language: str):
+        """逐个 yield 译文片段，同时记录首个 token 的耗时；出错时抛出异常。"""
+        tokens = queue.Queue()
+        done = object()
+        errors = []
+
+        def run():
+            try:
+                self.streaming_chain.run({
+                    "text": text,
+                    "source_language": source_language,
+                    "target_language": target_language,
+                }, callbacks=self.callbacks + [StreamingCallbackHandler(tokens)])
+            except Exception as e:
+                errors.append(e)
+            finally:
+                tokens.put(done)
+
+        start_time = time.perf_counter()
+        threading.Thread(target=run, daemon=True).start()
+
+        first_token = True
+        while True:
+            token = tokens.get()
+            if token is done:
+                break
+            if first_token:
+                first_token = False
+                METRICS.observe("llm_time_to_first_token_seconds", time.perf_counter() - start_time, model=self.model_name)
+            yield token
 
-        return result, True
\ No newline at end of file
+        METRICS.observe("llm_request_seconds", time.perf_counter() - start_time, model=self.model_name)
+        if errors:
+            LOG.error(f"An error occurred during streaming translation: {errors[0]}")
+            METRICS.inc("llm_request_errors_total", model=self.model_name)
+            raise errors[0]
@@ -0,0 +1,85 @@
+import hashlib
+import json
+import os
+import threading
+
+from utils import LOG
+
+
+class TranslationJournal:
+    """单个翻译任务的追加式日志，每完成一个内容块就记录一行，用于中断后续翻。"""
+
+    # 本进程中正在写入的日志路径，同一本书的并发任务各自写一个文件，不会互相覆盖
+    _in_use = set()
+    _in_use_lock = threading.Lock()
+
+    def __init__(self, journal_path: str, resume: bool = False):
+        journal_path = self.journal_path = self._claim(journal_path)
+        self.entries = {}
+
+        journal_dir = os.path.dirname(journal_path)
+        if journal_dir and not os.path.exists(journal_dir):
+            os.makedirs(journal_dir)
+
+        if resume and os.path.exists(journal_path):
+            self.entries = self.load(journal_path)
+            LOG.info(f"从日志 {journal_path} 恢复了 {len(self.entries)} 个已完成的内容块")
+
+        self._lock = threading.Lock()
+        self._file = open(journal_path, "a" if resume else "w", encoding="utf-8")
+
+    @classmethod
+    def _claim(cls, journal_path: str) -> str:
+        # 路径被占用时依次尝试 xxx.1.jsonl、xxx.2.jsonl，空闲的路径仍可被重新提交的任务续翻
+        base, extension = os.path.splitext(journal_path)
+        with cls._in_use_lock:
+            path, n = journal_path, 0
+            while path in cls._in_use:
+                n += 1
+                path = f"{base}.{n}{extension}"
+            cls._in_use.add(path)
+        if n:
+            LOG.info(f"日志 {journal_path} 正被另一个任务使用，改用 {path}")
+        return path
+
+    @staticmethod
+    def load(journal_path: str) -> dict:
+        entries = {}
+        with open(journal_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # 进程崩溃时最后一行可能只写了一半
+                    LOG.warning(f"跳过日志中不完整的记录: {line[:80]!r}")
+                    continue
+                entries[entry["key"]] = entry
+        return entries
+
+    @staticmethod
+    def fingerprint(content) -> str:
+        raw = f"{content.content_type.name}\x1f{content}"
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def lookup(self, key: str, content):
+        entry = self.entries.get(key)
+        if entry and entry["fingerprint"] == self.fingerprint(content):
+            return entry["translation"]
+        return None
+
+    def record(self, key: str, content, translation: str):
+        line = json.dumps({
+            "key": key,
+            "fingerprint": self.fingerprint(content),
+            "translation": translation,
+        }, ensure_ascii=False)
+        # 只写入并刷新到操作系统缓冲区，不逐行 fsync，避免拖慢并发翻译
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+        with self._in_use_lock:
+            self._in_use.discard(self.journal_path)
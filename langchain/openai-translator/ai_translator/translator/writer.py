@@ -1,29 +1,98 @@
+import io
+import math
 import os
-from reportlab.lib import colors, pagesizes, units
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
-from reportlab.platypus import (
-    SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
-)
+import tempfile
+
+from typing import Iterable, List
+from book import Book, Page, ContentType
+from utils import LOG, METRICS
+
+FONT_PATH = "../fonts/simsun.ttc"  # 请将此路径替换为您的字体文件路径
+
+# 字体和样式在每个进程中只创建一次，所有页面和表格共用
+_simsun_style = None
+_table_style = None
+
+
+def _get_styles():
+    global _simsun_style, _table_style
+    if _simsun_style is None:
+        # reportlab 只在导出 PDF 时才导入
+        from reportlab.lib import colors
+        from reportlab.lib.styles import ParagraphStyle
+        from reportlab.pdfbase import pdfmetrics
+        from reportlab.pdfbase.ttfonts import TTFont
+        from reportlab.platypus import TableStyle
+
+        # Register Chinese font
+        pdfmetrics.registerFont(TTFont("SimSun", FONT_PATH))
+
+        # Create a new ParagraphStyle with the SimSun font
+        _simsun_style = ParagraphStyle('SimSun', fontName='SimSun', fontSize=12, leading=14)
+        _table_style = TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'SimSun'),  # 更改表头字体为 "SimSun"
+            ('FONTSIZE', (0, 0), (-1, 0), 14),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+            ('FONTNAME', (0, 1), (-1, -1), 'SimSun'),  # 更改表格中的字体为 "SimSun"
+            ('GRID', (0, 0), (-1, -1), 1, colors.black)
+        ])
+    return _simsun_style, _table_style
+
+
+def _render_pages_pdf(pages: List[Page], output_file_path: str):
+    """把一组页面渲染成 PDF 文件，也作为并行渲染时子进程的入口。"""
+    from reportlab.lib import pagesizes
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Table, PageBreak
+
+    simsun_style, table_style = _get_styles()
+
+    # Create a PDF document
+    doc = SimpleDocTemplate(output_file_path, pagesize=pagesizes.letter)
+    story = []
+
+    # Iterate over the pages and contents
+    for page_idx, page in enumerate(pages):
+        for content in page.contents:
+            if content.status:
+                if content.content_type == ContentType.TEXT:
+                    # Add translated text to the PDF
+                    text = content.translation
+                    para = Paragraph(text, simsun_style)
+                    story.append(para)
+
+                elif content.content_type == ContentType.TABLE:
+                    # Add table to the PDF
+                    pdf_table = Table(content.translated_rows)
+                    pdf_table.setStyle(table_style)
+                    story.append(pdf_table)
+        # Add a page break after each page except the last one
+        if page_idx < len(pages) - 1:
+            story.append(PageBreak())
+
+    # Save the translated book as a new PDF file
+    doc.build(story)
+    return output_file_path
 
-from book import Book, ContentType
-from utils import LOG
 
 class Writer:
-    def __init__(self):
-        pass
+    def __init__(self, render_workers: int = 1):
+        self.render_workers = max(1, render_workers)
 
-    def save_translated_book(self, book: Book, ouput_file_format: str):
+    def save_translated_book(self, book: Book, ouput_file_format: str, output_file_path: str = None):
         LOG.debug(ouput_file_format)
 
-        if ouput_file_format.lower() == "pdf":
-            output_file_path = self._save_translated_book_pdf(book)
-        elif ouput_file_format.lower() == "markdown":
-            output_file_path = self._save_translated_book_markdown(book)
-        else:
-            LOG.error(f"不支持文件类型: {ouput_file_format}")
-            return ""
+        with METRICS.timer("writer_seconds", format=ouput_file_format.lower()):
+            if ouput_file_format.lower() == "pdf":
+                output_file_path = self._save_translated_book_pdf(book, output_file_path)
+            elif ouput_file_format.lower() == "markdown":
+                output_file_path = self._save_translated_book_markdown(book, output_file_path)
+            else:
+                LOG.error(f"不支持文件类型: {ouput_file_format}")
+                return ""
 
         LOG.info(f"翻译完成，文件保存至: {output_file_path}")
 
@@ -32,83 +101,87 @@ class Writer:
 
     def _save_translated_book_pdf(self, book: Book, output_file_path: str = None):
 
-        output_file_path = book.pdf_file_path.replace('.pdf', f'_translated.pdf')
+        output_file_path = output_file_path or book.pdf_file_path.replace('.pdf', f'_translated.pdf')
 
         LOG.info(f"开始导出: {output_file_path}")
 
-        # Register Chinese font
-        font_path = "../fonts/simsun.ttc"  # 请将此路径替换为您的字体文件路径
-        pdfmetrics.registerFont(TTFont("SimSun", font_path))
-
-        # Create a new ParagraphStyle with the SimSun font
-        simsun_style = ParagraphStyle('SimSun', fontName='SimSun', fontSize=12, leading=14)
-
-        # Create a PDF document
-        doc = SimpleDocTemplate(output_file_path, pagesize=pagesizes.letter)
-        styles = getSampleStyleSheet()
-        story = []
-
-        # Iterate over the pages and contents
-        for page in book.pages:
-            for content in page.contents:
-                if content.status:
-                    if content.content_type == ContentType.TEXT:
-                        # Add translated text to the PDF
-                        text = content.translation
-                        para = Paragraph(text, simsun_style)
-                        story.append(para)
-
-                    elif content.content_type == ContentType.TABLE:
-                        # Add table to the PDF
-                        table = content.translation
-                        table_style = TableStyle([
-                            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                            ('FONTNAME', (0, 0), (-1, 0), 'SimSun'),  # 更改表头字体为 "SimSun"
-                            ('FONTSIZE', (0, 0), (-1, 0), 14),
-                            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                            ('FONTNAME', (0, 1), (-1, -1), 'SimSun'),  # 更改表格中的字体为 "SimSun"
-                            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-                        ])
-                        pdf_table = Table(table.values.tolist())
-                        pdf_table.setStyle(table_style)
-                        story.append(pdf_table)
-            # Add a page break after each page except the last one
-            if page != book.pages[-1]:
-                story.append(PageBreak())
-
-        # Save the translated book as a new PDF file
-        doc.build(story)
+        if self.render_workers > 1 and len(book.pages) > 1:
+            self._save_pdf_parallel(book.pages, output_file_path)
+        else:
+            _render_pages_pdf(book.pages, output_file_path)
         return output_file_path
 
+    def _save_pdf_parallel(self, pages, output_file_path: str):
+        from concurrent.futures import ProcessPoolExecutor
+        from pypdf import PdfWriter
+
+        # 按页分组，各进程分别渲染成临时 PDF，最后按顺序合并
+        group_size = math.ceil(len(pages) / self.render_workers)
+        page_groups = [pages[start:start + group_size] for start in range(0, len(pages), group_size)]
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            part_paths = [os.path.join(temp_dir, f"part_{i}.pdf") for i in range(len(page_groups))]
+            with ProcessPoolExecutor(max_workers=self.render_workers) as executor:
+                list(executor.map(_render_pages_pdf, page_groups, part_paths))
+
+            merger = PdfWriter()
+            for part_path in part_paths:
+                merger.append(part_path)
+            with open(output_file_path, "wb") as output_file:
+                merger.write(output_file)
+            merger.close()
+        LOG.debug(f"使用 {self.render_workers} 个进程渲染了 {len(page_groups)} 组页面")
+
 
     def _save_translated_book_markdown(self, book: Book, output_file_path: str = None):
-        output_file_path = book.pdf_file_path.replace('.pdf', f'_translated.md')
+        output_file_path = output_file_path or book.pdf_file_path.replace('.pdf', f'_translated.md')
 
         LOG.info(f"开始导出: {output_file_path}")
         with open(output_file_path, 'w', encoding='utf-8') as output_file:
             # Iterate over the pages and contents
             for page in book.pages:
-                for content in page.contents:
-                    if content.status:
-                        if content.content_type == ContentType.TEXT:
-                            # Add translated text to the Markdown file
-                            text = content.translation
-                            output_file.write(text + '\n\n')
-
-                        elif content.content_type == ContentType.TABLE:
-                            # Add table to the Markdown file
-                            table = content.translation
-                            header = '| ' + ' | '.join(str(column) for column in table.columns) + ' |' + '\n'
-                            separator = '| ' + ' | '.join(['---'] * len(table.columns)) + ' |' + '\n'
-                            # body = '\n'.join(['| ' + ' | '.join(row) + ' |' for row in table.values.tolist()]) + '\n\n'
-                            body = '\n'.join(['| ' + ' | '.join(str(cell) for cell in row) + ' |' for row in table.values.tolist()]) + '\n\n'
-                            output_file.write(header + separator + body)
+                self._write_markdown_page(output_file, page)
 
                 # Add a page break (horizontal rule) after each page except the last one
                 if page != book.pages[-1]:
                     output_file.write('---\n\n')
 
-        return output_file_path
\ No newline at end of file
+        return output_file_path
+
+    def save_translated_pages_markdown(self, pdf_file_path: str, pages: Iterable[Page]):
+        """流式导出：每翻译完一页就追加写入并刷新，任务运行期间即可查看部分结果。"""
+        output_file_path = pdf_file_path.replace('.pdf', f'_translated.md')
+
+        LOG.info(f"开始流式导出: {output_file_path}")
+        with open(output_file_path, 'w', encoding='utf-8') as output_file:
+            for page_idx, page in enumerate(pages):
+                # Add a page break (horizontal rule) before each page except the first one
+                if page_idx > 0:
+                    output_file.write('---\n\n')
+                self._write_markdown_page(output_file, page)
+                output_file.flush()
+
+        LOG.info(f"翻译完成，文件保存至: {output_file_path}")
+
+        return output_file_path
+
+    def render_markdown_page(self, page: Page) -> str:
+        buffer = io.StringIO()
+        self._write_markdown_page(buffer, page)
+        return buffer.getvalue()
+
+    def _write_markdown_page(self, output_file, page: Page):
+        for content in page.contents:
+            if content.status:
+                if content.content_type == ContentType.TEXT:
+                    # Add translated text to the Markdown file
+                    text = content.translation
+                    output_file.write(text + '\n\n')
+
+                elif content.content_type == ContentType.TABLE:
+                    # Add table to the Markdown file
+                    columns = content.translated_header
+                    header = '| ' + ' | '.join(str(column) for column in columns) + ' |' + '\n'
+                    separator = '| ' + ' | '.join(['---'] * len(columns)) + ' |' + '\n'
+                    body = '\n'.join(['| ' + ' | '.join(str(cell) for cell in row) + ' |' for row in content.translated_rows]) + '\n\n'
+                    output_file.write(header + separator + body)
\ No newline at end of file
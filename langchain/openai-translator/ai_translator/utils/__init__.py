@@ -1,2 +1,3 @@
 from .argument_parser import ArgumentParser
-from .logger import LOG
\ No newline at end of file
+from .logger import LOG
+from .metrics import METRICS
\ No newline at end of file
@@ -9,6 +9,24 @@ class ArgumentParser:
         self.parser.add_argument('--output_file_format', type=str, help='The file format of translated book. Now supporting PDF and Markdown')
         self.parser.add_argument('--source_language', type=str, help='The language of the original book to be translated.')
         self.parser.add_argument('--target_language', type=str, help='The target language for translating the original book.')
+        self.parser.add_argument('--target_languages', type=str, nargs='+', help='Parse the book once and translate it into each of these languages concurrently.')
+        self.parser.add_argument('--pack_token_budget', type=int, help='Token budget for packing consecutive small text blocks into one request. 0 disables packing.')
+        self.parser.add_argument('--parse_workers', type=int, help='Number of processes used to parse the PDF in parallel by page range.')
+        self.parser.add_argument('--render_workers', type=int, help='Number of processes used to render PDF output in parallel by page group.')
+        self.parser.add_argument('--stream_window', type=int, help='Translate and write Markdown output page by page, keeping at most this many pages in memory. 0 disables streaming.')
+        self.parser.add_argument('--input_dir', type=str, help='Batch mode: directory of PDF files to translate.')
+        self.parser.add_argument('--manifest', type=str, help='Batch mode: text file listing one PDF path per line.')
+        self.parser.add_argument('--book_workers', type=int, help='Batch mode: number of books parsed and scheduled at the same time.')
+        self.parser.add_argument('--batch_report', type=str, help='Batch mode: path of the per-book and aggregate JSON report.')
+        self.parser.add_argument('--rpm', type=int, help='Requests per minute shared by all translation jobs. 0 disables the limit.')
+        self.parser.add_argument('--tpm', type=int, help='Tokens per minute shared by all translation jobs. 0 disables the limit.')
+        self.parser.add_argument('--job_workers', type=int, help='Number of translation jobs the server runs at the same time.')
+        self.parser.add_argument('--job_queue_depth', type=int, help='Maximum number of queued jobs before the server answers 429.')
+        self.parser.add_argument('--no_dedupe_boilerplate', dest='dedupe_boilerplate', action='store_false', default=None, help='Do not split repeated headers and footers into separately translated blocks.')
+        self.parser.add_argument('--previous_journal', type=str, help='Journal of the previous edition; blocks whose source is unchanged reuse its translation.')
+        self.parser.add_argument('--resume', action='store_true', default=None, help='Resume an interrupted job from its journal, skipping finished blocks.')
+        self.parser.add_argument('--no_cache', action='store_true', default=None, help='Bypass the persistent translation cache.')
+        self.parser.add_argument('--max_workers', type=int, help='Maximum number of translation requests in flight at the same time. 1 means sequential.')
 
     def parse_arguments(self):
         args = self.parser.parse_args()
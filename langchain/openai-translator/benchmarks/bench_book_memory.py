@@ -0,0 +1,42 @@
+"""解析后 Book 对象的内存占用基准：对比紧凑的行列表表示与为每个表格创建 DataFrame 的开销。
+
+用法（在 langchain/openai-translator 目录下）：
+    python benchmarks/bench_book_memory.py --input_file tests/The_Old_Man_of_the_Sea.pdf
+"""
+import argparse
+import os
+import sys
+import tracemalloc
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "ai_translator"))
+
+from book import ContentType
+from translator.pdf_parser import PDFParser
+
+
+def book_footprint(input_file: str, copies: int):
+    # 多次解析同一本书以模拟大书，tracemalloc 只统计解析结果仍然占用的内存
+    tracemalloc.start()
+    books = [PDFParser().parse_pdf(input_file) for _ in range(copies)]
+    compact, _ = tracemalloc.get_traced_memory()
+
+    # 旧的数据模型在解析时就为每个表格创建 DataFrame
+    dataframes = [content.to_dataframe() for book in books for page in book.pages for content in page.contents
+                  if content.content_type == ContentType.TABLE]
+    with_dataframes, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    block_count = sum(len(page.contents) for book in books for page in book.pages)
+    return block_count, len(dataframes), compact, with_dataframes
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure the memory footprint of a parsed Book.")
+    parser.add_argument("--input_file", type=str, default="tests/The_Old_Man_of_the_Sea.pdf")
+    parser.add_argument("--copies", type=int, default=10)
+    args = parser.parse_args()
+
+    block_count, table_count, compact, with_dataframes = book_footprint(args.input_file, args.copies)
+    print(f"{block_count} blocks, {table_count} tables")
+    print(f"compact book:           {compact / 1024:.1f} KiB ({compact / max(block_count, 1):.0f} B/block)")
+    print(f"with eager DataFrames:  {with_dataframes / 1024:.1f} KiB ({with_dataframes / max(block_count, 1):.0f} B/block)")
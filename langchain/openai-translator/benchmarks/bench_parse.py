@@ -0,0 +1,42 @@
+"""PDFParser 并行解析基准：对比不同进程数下的解析耗时。
+
+用法（在 langchain/openai-translator 目录下）：
+    python benchmarks/bench_parse.py --input_file tests/The_Old_Man_of_the_Sea.pdf
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "ai_translator"))
+
+from translator.pdf_parser import PDFParser
+
+
+def bench_parse(input_file: str, workers: int, repeat: int):
+    parser = PDFParser(workers)
+    best = float("inf")
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        book = parser.parse_pdf(input_file)
+        best = min(best, time.perf_counter() - start_time)
+    return best, len(book.pages)
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Benchmark PDFParser with different numbers of worker processes.")
+    arg_parser.add_argument("--input_file", type=str, default="tests/The_Old_Man_of_the_Sea.pdf")
+    arg_parser.add_argument("--max_workers", type=int, default=os.cpu_count())
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    worker_counts = [1]
+    while worker_counts[-1] * 2 <= args.max_workers:
+        worker_counts.append(worker_counts[-1] * 2)
+
+    baseline = None
+    print(f"{'workers':>8} {'pages':>6} {'seconds':>9} {'pages/s':>9} {'speedup':>8}")
+    for workers in worker_counts:
+        elapsed, page_count = bench_parse(args.input_file, workers, args.repeat)
+        baseline = baseline or elapsed
+        print(f"{workers:>8} {page_count:>6} {elapsed:>9.3f} {page_count / elapsed:>9.1f} {baseline / elapsed:>7.2f}x")
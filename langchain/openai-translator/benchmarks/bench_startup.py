@@ -0,0 +1,50 @@
+"""启动耗时基准：多次运行 `main.py --help` 和 `python -X importtime`，统计启动时间和最慢的导入。
+
+用法（在项目目录下）：
+    python benchmarks/bench_startup.py --repeat 10
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+MAIN_PY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "ai_translator", "main.py")
+
+
+def time_help(repeat: int):
+    timings = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        subprocess.run([sys.executable, MAIN_PY, "--help"], check=True, stdout=subprocess.DEVNULL)
+        timings.append(time.perf_counter() - start_time)
+    return timings
+
+
+def slowest_imports(top: int):
+    result = subprocess.run([sys.executable, "-X", "importtime", MAIN_PY, "--help"],
+                            check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    imports = []
+    for line in result.stderr.splitlines():
+        # 格式: "import time:  self [us] | cumulative | imported package"
+        parts = line.split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        imports.append((int(parts[1]), parts[2].rstrip()))
+    return sorted(imports, reverse=True)[:top]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark CLI startup time.")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--top", type=int, default=15, help="Number of slowest imports to show.")
+    args = parser.parse_args()
+
+    timings = time_help(args.repeat)
+    print(f"main.py --help: median {statistics.median(timings) * 1000:.0f} ms, "
+          f"min {min(timings) * 1000:.0f} ms over {args.repeat} runs")
+
+    print(f"\nslowest imports (cumulative):")
+    for cumulative_us, package in slowest_imports(args.top):
+        print(f"{cumulative_us / 1000:>9.1f} ms {package}")
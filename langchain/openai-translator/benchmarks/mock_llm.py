@@ -0,0 +1,34 @@
+"""离线基准测试使用的模拟 TranslationChain，不调用任何付费 API。"""
+import random
+import threading
+import time
+
+from book import TableContent
+
+
+class MockTranslationChain:
+    """与 TranslationChain 接口一致，返回确定性的译文，可配置延迟和失败率。"""
+
+    def __init__(self, model_name: str = "gpt-3.5-turbo", latency: float = 0.05, failure_rate: float = 0.0,
+                 seed: int = 0):
+        self.model_name = model_name
+        self.template = "mock translation of {source_language} to {target_language}"
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.calls = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def run(self, text, source_language: str, target_language: str) -> (str, bool):
+        with self._lock:
+            self.calls += 1
+            failed = self._random.random() < self.failure_rate
+        time.sleep(self.latency)
+        if failed:
+            return "", False
+
+        if isinstance(text, TableContent):
+            # 按 TableContent.set_translation 能解析的 "[a, b] [c, d]" 格式返回
+            rows = [row for table in text.original for row in table]
+            return " ".join("[" + ", ".join(f"{target_language}:{cell}" for cell in row) + "]" for row in rows), True
+        return f"[{target_language}] {text}", True
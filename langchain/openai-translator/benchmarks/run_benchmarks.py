@@ -0,0 +1,108 @@
+"""解析、翻译、导出各阶段的离线基准测试，LLM 调用由 MockTranslationChain 模拟。
+
+用法（在 langchain/openai-translator 目录下）：
+    python benchmarks/run_benchmarks.py --save_baseline benchmarks/baseline.json
+    python benchmarks/run_benchmarks.py --compare benchmarks/baseline.json
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "ai_translator"))
+
+from translator.pdf_parser import PDFParser
+from translator.pdf_translator import PDFTranslator
+from translator.writer import Writer
+from mock_llm import MockTranslationChain
+
+DEFAULT_BOOKS = ["tests/test.pdf", "tests/The_Old_Man_of_the_Sea.pdf"]
+
+
+def measure(func, *args, **kwargs):
+    """返回 (结果, 耗时秒数, 峰值内存 MB)。"""
+    tracemalloc.start()
+    start_time = time.perf_counter()
+    result = func(*args, **kwargs)
+    elapsed = time.perf_counter() - start_time
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak / 1024 / 1024
+
+
+def bench_book(input_file: str, args) -> dict:
+    results = {}
+
+    book, elapsed, peak_mb = measure(PDFParser(args.parse_workers).parse_pdf, input_file)
+    block_count = sum(len(page.contents) for page in book.pages)
+    results["parse"] = {"seconds": elapsed, "peak_mb": peak_mb, "pages": len(book.pages), "blocks": block_count}
+
+    chain = MockTranslationChain(latency=args.latency, failure_rate=args.failure_rate, seed=args.seed)
+    translator = PDFTranslator(chain.model_name, max_workers=args.max_workers,
+                               pack_token_budget=args.pack_token_budget, translate_chain=chain)
+    _, elapsed, peak_mb = measure(translator.translate_book, book)
+    results["translate"] = {"seconds": elapsed, "peak_mb": peak_mb, "blocks_per_second": block_count / elapsed,
+                            "requests": chain.calls}
+
+    writer = Writer()
+    for output_file_format in ["markdown", "pdf"]:
+        try:
+            _, elapsed, peak_mb = measure(writer.save_translated_book, book, output_file_format)
+            results[f"write_{output_file_format}"] = {"seconds": elapsed, "peak_mb": peak_mb}
+        except Exception as e:
+            # PDF 导出依赖中文字体文件，缺失时记录错误继续其他阶段
+            results[f"write_{output_file_format}"] = {"error": str(e)}
+    return results
+
+
+def print_results(all_results: dict, baseline: dict = None):
+    print(f"{'book':<28} {'stage':<16} {'metric':<18} {'value':>12} {'baseline':>12} {'change':>8}")
+    for book_name, stages in all_results.items():
+        for stage, metrics in stages.items():
+            for metric, value in metrics.items():
+                if not isinstance(value, (int, float)):
+                    print(f"{book_name:<28} {stage:<16} {metric:<18} {str(value)[:40]}")
+                    continue
+                line = f"{book_name:<28} {stage:<16} {metric:<18} {value:>12.3f}"
+                base = (baseline or {}).get(book_name, {}).get(stage, {}).get(metric)
+                if isinstance(base, (int, float)):
+                    change = f"{(value - base) / base:+.1%}" if base else "n/a"
+                    line += f" {base:>12.3f} {change:>8}"
+                print(line)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline benchmark of the parse, translate and write stages.")
+    parser.add_argument("--books", nargs="+", default=DEFAULT_BOOKS)
+    parser.add_argument("--latency", type=float, default=0.05, help="Simulated LLM latency per request in seconds.")
+    parser.add_argument("--failure_rate", type=float, default=0.0, help="Fraction of simulated LLM requests that fail.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max_workers", type=int, default=8)
+    parser.add_argument("--parse_workers", type=int, default=1)
+    parser.add_argument("--pack_token_budget", type=int, default=0)
+    parser.add_argument("--save_baseline", type=str, help="Write the results to this JSON file.")
+    parser.add_argument("--compare", type=str, help="Compare the results with a baseline JSON file.")
+    args = parser.parse_args()
+
+    all_results = {}
+    with tempfile.TemporaryDirectory() as work_dir:
+        for input_file in args.books:
+            # 在临时目录中运行，避免导出文件覆盖 tests/ 下的样例
+            work_file = os.path.join(work_dir, os.path.basename(input_file))
+            shutil.copy(input_file, work_file)
+            all_results[os.path.basename(input_file)] = bench_book(work_file, args)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_results(all_results, baseline)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(all_results, f, indent=2, ensure_ascii=False)
+        print(f"Baseline saved to {args.save_baseline}")
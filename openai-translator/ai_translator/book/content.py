@@ -1,6 +1,4 @@
-import pandas as pd
 from enum import Enum, auto
-from PIL import Image as PILImage
 from utils import LOG
 
 class ContentType(Enum):
@@ -26,13 +24,16 @@ class Content:
             return True
         elif self.content_type == ContentType.TABLE and isinstance(translation, list):
             return True
-        elif self.content_type == ContentType.IMAGE and isinstance(translation, PILImage.Image):
-            return True
+        elif self.content_type == ContentType.IMAGE:
+            from PIL import Image as PILImage
+            return isinstance(translation, PILImage.Image)
         return False
 
 
 class TableContent(Content):
     def __init__(self, data, translation=None):
+        import pandas as pd
+
         df = pd.DataFrame(data)
 
         # Verify if the number of rows and columns in the data and DataFrame object match
@@ -42,6 +43,8 @@ class TableContent(Content):
         super().__init__(ContentType.TABLE, df)
 
     def set_translation(self, translation, status):
+        import pandas as pd
+
         try:
             if not isinstance(translation, str):
                 raise ValueError(f"Invalid translation type. Expected str, but got {type(translation)}")
@@ -60,6 +63,27 @@ class TableContent(Content):
             self.translation = None
             self.status = False
 
+    def iter_tables(self):
+        """original 的每一行是 PDFParser 提取的一个表格，每个“单元格”是该表格的一行（行数不足时为 None），
+        这里还原成真正的表格：返回 [表格][行][列]。"""
+        for table in self.original.values.tolist():
+            yield [["" if cell is None else str(cell) for cell in row] for row in table if isinstance(row, (list, tuple))]
+
+    def set_translated_cells(self, cells, status):
+        """cells: (表格, 行, 列) -> 译文，未给出的单元格保留原文。
+
+        各表格按顺序纵向拼接，第一行作为表头，与 set_translation 的结果格式一致。
+        """
+        import pandas as pd
+
+        rows = [[cells.get((table_idx, row_idx, col_idx), value) for col_idx, value in enumerate(row)]
+                for table_idx, table in enumerate(self.iter_tables())
+                for row_idx, row in enumerate(table)]
+        width = max(len(row) for row in rows)
+        rows = [row + [""] * (width - len(row)) for row in rows]
+        self.translation = pd.DataFrame(rows[1:], columns=rows[0])
+        self.status = status
+
     def __str__(self):
         return self.original.to_string(header=False, index=False)
 
@@ -4,8 +4,7 @@ import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from utils import ArgumentParser, ConfigLoader, LOG
-from model import GLMModel, OpenAIModel
-from translator import PDFTranslator
+from translator import PDFTranslator, TranslationCache
 
 if __name__ == "__main__":
     argument_parser = ArgumentParser()
@@ -14,14 +13,69 @@ if __name__ == "__main__":
 
     config = config_loader.load_config()
 
-    model_name = args.openai_model if args.openai_model else config['OpenAIModel']['model']
-    api_key = args.openai_api_key if args.openai_api_key else config['OpenAIModel']['api_key']
-    model = OpenAIModel(model=model_name, api_key=api_key)
+    # 只导入 --model_type 选中的模型客户端
+    if args.model_type == 'ModelPool':
+        from model import ModelPool, Backend
 
+        # 每个后端的配置在对应模型配置的基础上覆盖，例如多个 ChatGLM 副本只需给出各自的 model_url
+        pool_config = config['ModelPool']
+        backends = []
+        for backend_config in pool_config['backends']:
+            backend_config = dict(backend_config)
+            backend_type = backend_config.pop('type')
+            capacity = backend_config.pop('capacity', 8)
+            overflow = backend_config.pop('overflow', False)
+            if backend_type == 'GLMModel':
+                from model import GLMModel
+                model_config = {**config['GLMModel'], **backend_config}
+                backend_model = GLMModel(model_url=model_config['model_url'], timeout=model_config['timeout'],
+                                         pool_size=capacity)
+            else:
+                from model import OpenAIModel
+                model_config = {**config['OpenAIModel'], **backend_config}
+                backend_model = OpenAIModel(model=model_config['model'], api_key=model_config['api_key'],
+                                            rpm=model_config['rpm'], tpm=model_config['tpm'],
+                                            max_retries=model_config['max_retries'])
+            backends.append(Backend(backend_model, capacity=capacity, overflow=overflow))
+        model = ModelPool(backends,
+                          max_error_rate=pool_config['max_error_rate'],
+                          eject_after_failures=pool_config['eject_after_failures'],
+                          eject_seconds=pool_config['eject_seconds'],
+                          hedge_after=pool_config['hedge_after'])
+    elif args.model_type == 'GLMModel':
+        from model import GLMModel
+
+        model_url = args.glm_model_url if args.glm_model_url else config['GLMModel']['model_url']
+        timeout = args.timeout if args.timeout else config['GLMModel']['timeout']
+        model = GLMModel(model_url=model_url, timeout=timeout, pool_size=config['GLMModel']['pool_size'])
+    else:
+        from model import OpenAIModel
+
+        model_name = args.openai_model if args.openai_model else config['OpenAIModel']['model']
+        api_key = args.openai_api_key if args.openai_api_key else config['OpenAIModel']['api_key']
+        model = OpenAIModel(model=model_name, api_key=api_key,
+                            rpm=config['OpenAIModel']['rpm'],
+                            tpm=config['OpenAIModel']['tpm'],
+                            max_retries=config['OpenAIModel']['max_retries'])
 
     pdf_file_path = args.book if args.book else config['common']['book']
     file_format = args.file_format if args.file_format else config['common']['file_format']
+    max_workers = args.max_workers if args.max_workers else config['common'].get('max_workers', 1)
+
+    cache = None
+    if not args.no_cache:
+        cache = TranslationCache(config['common']['cache_file'], config['common']['cache_max_entries'])
 
     # 实例化 PDFTranslator 类，并调用 translate_pdf() 方法
-    translator = PDFTranslator(model)
-    translator.translate_pdf(pdf_file_path, file_format)
+    table_mode = args.table_mode if args.table_mode else config['common'].get('table_mode', 'cells')
+    translator = PDFTranslator(model, max_workers=max_workers, cache=cache, table_mode=table_mode)
+    translator.translate_pdf(pdf_file_path, file_format,
+                             batch_requests_file=args.batch_requests,
+                             batch_results_file=args.batch_results)
+
+    # 输出限流器状态，用于调整 max_workers 和 rpm/tpm
+    if args.model_type == 'OpenAIModel':
+        LOG.info(f"限流器状态: {model.rate_limiter.metrics()}")
+    elif args.model_type == 'ModelPool':
+        LOG.info(f"模型池状态: {model.metrics()}")
+        model.close()
@@ -1,3 +1,15 @@
 from .model import Model
-from .glm_model import GLMModel
-from .openai_model import OpenAIModel
\ No newline at end of file
+
+
+def __getattr__(name):
+    # 模型客户端按需导入，只加载 --model_type 选中的那一个
+    if name == "GLMModel":
+        from .glm_model import GLMModel
+        return GLMModel
+    if name in ("ModelPool", "Backend"):
+        from . import model_pool
+        return getattr(model_pool, name)
+    if name == "OpenAIModel":
+        from .openai_model import OpenAIModel
+        return OpenAIModel
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,12 +1,27 @@
+import asyncio
 import requests
 import simplejson
 
+from requests.adapters import HTTPAdapter
 from model import Model
 
 class GLMModel(Model):
-    def __init__(self, model_url: str, timeout: int):
+    def __init__(self, model_url: str, timeout: int, pool_size: int = 10):
         self.model_url = model_url
         self.timeout = timeout
+        self.pool_size = pool_size
+
+        # 复用 TCP 连接：同一个 Session 在多个线程间共享，连接池满时阻塞等待而不是新建连接
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, pool_block=True)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._async_session = None
+        self._async_loop = None
+
+    def model_name(self) -> str:
+        return f"GLMModel:{self.model_url}"
 
     def make_request(self, prompt):
         try:
@@ -14,17 +29,59 @@ class GLMModel(Model):
                 "prompt": prompt,
                 "history": []
             }
-            response = requests.post(self.model_url, json=payload, timeout=self.timeout)
+            response = self.session.post(self.model_url, json=payload, timeout=self.timeout)
             response.raise_for_status()
             response_dict = response.json()
             translation = response_dict["response"]
             return translation, True
-        except requests.exceptions.RequestException as e:
-            raise Exception(f"请求异常：{e}")
         except requests.exceptions.Timeout as e:
             raise Exception(f"请求超时：{e}")
+        except requests.exceptions.RequestException as e:
+            raise Exception(f"请求异常：{e}")
         except simplejson.errors.JSONDecodeError as e:
             raise Exception("Error: response is not valid JSON format.")
         except Exception as e:
             raise Exception(f"发生了未知错误：{e}")
-        return "", False
+
+    async def make_request_async(self, prompt):
+        import aiohttp
+
+        session = self._get_async_session()
+        try:
+            payload = {
+                "prompt": prompt,
+                "history": []
+            }
+            async with session.post(self.model_url, json=payload) as response:
+                response.raise_for_status()
+                response_dict = await response.json(content_type=None)
+            translation = response_dict["response"]
+            return translation, True
+        except asyncio.TimeoutError as e:
+            raise Exception(f"请求超时：{e}")
+        except aiohttp.ClientError as e:
+            raise Exception(f"请求异常：{e}")
+        except ValueError as e:
+            raise Exception("Error: response is not valid JSON format.")
+        except Exception as e:
+            raise Exception(f"发生了未知错误：{e}")
+
+    def _get_async_session(self):
+        import aiohttp
+
+        # aiohttp 的 Session 绑定在创建它的事件循环上，换了事件循环需要重新创建
+        loop = asyncio.get_running_loop()
+        if self._async_session is None or self._async_session.closed or self._async_loop is not loop:
+            connector = aiohttp.TCPConnector(limit=self.pool_size)
+            self._async_session = aiohttp.ClientSession(
+                connector=connector, timeout=aiohttp.ClientTimeout(total=self.timeout))
+            self._async_loop = loop
+        return self._async_session
+
+    async def close_async(self):
+        if self._async_session is not None and not self._async_session.closed:
+            await self._async_session.close()
+        self._async_session = None
+
+    def close(self):
+        self.session.close()
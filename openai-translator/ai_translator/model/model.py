@@ -7,11 +7,36 @@ class Model:
     def make_table_prompt(self, table: str, target_language: str) -> str:
         return f"翻译为{target_language}，保持间距（空格，分隔符），以表格形式返回：\n{table}"
 
+    def make_cells_prompt(self, cells, target_language: str) -> str:
+        numbered = "\n".join(f"{idx}. {' '.join(cell.split())}" for idx, cell in enumerate(cells, start=1))
+        return f"翻译为{target_language}，以下是表格单元格，逐行翻译，保留行首编号，每行一个，不要添加其他内容：\n{numbered}"
+
     def translate_prompt(self, content, target_language: str) -> str:
         if content.content_type == ContentType.TEXT:
             return self.make_text_prompt(content.original, target_language)
         elif content.content_type == ContentType.TABLE:
             return self.make_table_prompt(content.get_original_as_str(), target_language)
 
+    def model_name(self) -> str:
+        return self.__class__.__name__
+
+    def context_window(self) -> int:
+        # ChatGLM-6B 的上下文长度
+        return 2048
+
+    def count_tokens(self, text: str) -> int:
+        # ChatGLM 的分词器不在本地，按字符数保守估计：中文约一字一个 token，英文远少于字符数
+        return len(text)
+
     def make_request(self, prompt):
         raise NotImplementedError("子类必须实现 make_request 方法")
+
+    def make_stream_request(self, prompt):
+        """逐段返回译文的生成器；不支持流式输出的模型一次性返回完整译文。"""
+        translation, status = self.make_request(prompt)
+        if status:
+            yield translation
+
+    def make_batch_request(self, prompt: str) -> dict:
+        """返回 Batch API 请求行中的 url 和 body，不支持离线批量接口的模型不实现。"""
+        raise NotImplementedError(f"{self.model_name()} 不支持 Batch API")
@@ -0,0 +1,217 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import List, Optional
+
+from model import Model
+from utils import LOG
+
+
+class Backend:
+    """模型池中的一个后端及其健康状况统计。"""
+
+    def __init__(self, model: Model, capacity: int = 8, overflow: bool = False):
+        self.model = model
+        self.capacity = max(1, capacity)
+        # overflow 后端只在主后端都不可用或已满时使用
+        self.overflow = overflow
+        self.in_flight = 0
+        self.latency = None  # 成功请求耗时的 EWMA（秒）
+        self.error_rate = 0.0  # 失败率的 EWMA
+        self.consecutive_failures = 0
+        self.ejected_until = 0.0
+        # 剔除期结束后先放行一个探测请求（半开状态），成功后才恢复正常调度，失败则再次剔除
+        self.probing = False
+        self.requests = 0
+        self.successes = 0
+        self.failures = 0
+        self.ejections = 0
+
+    def name(self) -> str:
+        return self.model.model_name()
+
+    def healthy(self, now: float) -> bool:
+        return now >= self.ejected_until
+
+    def score(self, prior_latency: float) -> float:
+        # 没有延迟数据时使用先验延迟，排队越多、失败率越高得分越差
+        latency = self.latency if self.latency is not None else prior_latency
+        return latency * (1 + self.in_flight) / max(0.1, 1 - self.error_rate)
+
+
+class ModelPool(Model):
+    """把请求分配到多个后端：按延迟和失败率的 EWMA 选择后端，连续失败的后端暂时剔除，
+    可选地在请求超过 hedge_after 秒仍未返回时向另一个后端发送对冲请求，取先返回的结果。"""
+
+    def __init__(self, backends: List[Backend], alpha: float = 0.2, max_error_rate: float = 0.5,
+                 eject_after_failures: int = 3, eject_seconds: float = 30.0, hedge_after: Optional[float] = None):
+        if not backends:
+            raise ValueError("ModelPool 至少需要一个后端")
+        self.backends = backends
+        self.alpha = alpha
+        self.max_error_rate = max_error_rate
+        self.eject_after_failures = eject_after_failures
+        self.eject_seconds = eject_seconds
+        self.hedge_after = hedge_after if hedge_after and hedge_after > 0 else None
+        self.hedged = 0
+        self.hedge_wins = 0
+        self._lock = threading.Lock()
+        # 对冲请求需要并行发出，每个在途请求最多占用两个线程
+        self._executor = ThreadPoolExecutor(max_workers=2 * sum(backend.capacity for backend in backends)) \
+            if self.hedge_after else None
+
+    def model_name(self) -> str:
+        return "ModelPool[" + ",".join(backend.name() for backend in self.backends) + "]"
+
+    def context_window(self) -> int:
+        # 同一个提示词可能发给任意后端，按最小的上下文窗口切分
+        return min(backend.model.context_window() for backend in self.backends)
+
+    def count_tokens(self, text: str) -> int:
+        # 按分词最多的后端计算，切分出的片段对每个后端都不超长
+        return max(backend.model.count_tokens(text) for backend in self.backends)
+
+    def _acquire(self, exclude=()) -> Optional[Backend]:
+        with self._lock:
+            now = time.monotonic()
+            candidates = [backend for backend in self.backends if backend not in exclude]
+            if not candidates:
+                return None
+            healthy = [backend for backend in candidates if backend.healthy(now)]
+            # 剔除期刚结束、还没有在途请求的后端先接一个探测请求；探测期间不再分配其他请求
+            probes = [backend for backend in healthy if backend.probing and backend.in_flight == 0]
+            healthy = [backend for backend in healthy if not backend.probing]
+            available = [backend for backend in healthy if backend.in_flight < backend.capacity]
+            primary = [backend for backend in available if not backend.overflow]
+            # 先验延迟取已有数据的后端的平均值，新加入的后端与它们同等对待
+            known = [backend.latency for backend in self.backends if backend.latency is not None]
+            prior_latency = sum(known) / len(known) if known else 1.0
+
+            def rank(backend):
+                return backend.score(prior_latency)
+
+            # 优先级：探测请求 > 未满的主后端 > 未满的 overflow 后端 > 健康但已满的后端 > 最早恢复的被剔除后端
+            if probes:
+                backend = probes[0]
+            elif primary:
+                backend = min(primary, key=rank)
+            elif available:
+                backend = min(available, key=rank)
+            elif healthy:
+                backend = min(healthy, key=lambda backend: backend.in_flight / backend.capacity)
+            else:
+                backend = min(candidates, key=lambda backend: backend.ejected_until)
+            backend.in_flight += 1
+            backend.requests += 1
+            return backend
+
+    def _release(self, backend: Backend, elapsed: float, ok: bool):
+        with self._lock:
+            backend.in_flight -= 1
+            probe = backend.probing
+            backend.probing = False
+            backend.error_rate = (1 - self.alpha) * backend.error_rate + self.alpha * (0.0 if ok else 1.0)
+            if ok:
+                if probe:
+                    LOG.info(f"后端 {backend.name()} 探测成功，恢复调度")
+                backend.successes += 1
+                backend.latency = elapsed if backend.latency is None else (1 - self.alpha) * backend.latency + self.alpha * elapsed
+                backend.consecutive_failures = 0
+                return
+            backend.failures += 1
+            backend.consecutive_failures += 1
+            if probe or backend.consecutive_failures >= self.eject_after_failures or backend.error_rate > self.max_error_rate:
+                backend.ejected_until = time.monotonic() + self.eject_seconds
+                backend.probing = True
+                backend.ejections += 1
+                backend.consecutive_failures = 0
+                # 恢复后从中等失败率重新开始，避免刚恢复就再次被剔除
+                backend.error_rate = self.max_error_rate / 2
+                LOG.warning(f"后端 {backend.name()} 不健康，剔除 {self.eject_seconds} 秒")
+
+    def _call(self, backend: Backend, prompt: str):
+        start_time = time.perf_counter()
+        try:
+            translation, status = backend.model.make_request(prompt)
+        except Exception as e:
+            self._release(backend, time.perf_counter() - start_time, False)
+            LOG.warning(f"后端 {backend.name()} 请求失败: {e}")
+            raise
+        self._release(backend, time.perf_counter() - start_time, status)
+        return translation, status
+
+    def make_request(self, prompt):
+        tried = []
+        last_error = None
+        # 失败后换一个后端重试，每个后端最多尝试一次
+        while len(tried) < len(self.backends):
+            backend = self._acquire(exclude=tried)
+            tried.append(backend)
+            try:
+                if self.hedge_after:
+                    translation, status = self._hedged_request(backend, prompt, tried)
+                else:
+                    translation, status = self._call(backend, prompt)
+                if status:
+                    return translation, status
+            except Exception as e:
+                last_error = e
+        raise Exception(f"所有后端均请求失败：{last_error}")
+
+    def _hedged_request(self, backend: Backend, prompt: str, tried: list):
+        primary = self._executor.submit(self._call, backend, prompt)
+        done, _ = wait([primary], timeout=self.hedge_after)
+        if done:
+            return primary.result()
+
+        hedge_backend = self._acquire(exclude=tried)
+        if hedge_backend is None:
+            return primary.result()
+        tried.append(hedge_backend)
+        with self._lock:
+            self.hedged += 1
+        hedge = self._executor.submit(self._call, hedge_backend, prompt)
+
+        # 先返回且成功的结果胜出；落后的请求继续在后台完成，只用于更新统计
+        pending = {primary, hedge}
+        last_error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    translation, status = future.result()
+                except Exception as e:
+                    last_error = e
+                    continue
+                if status:
+                    if future is hedge:
+                        with self._lock:
+                            self.hedge_wins += 1
+                    return translation, status
+        raise Exception(f"对冲请求均失败：{last_error}")
+
+    def metrics(self) -> dict:
+        with self._lock:
+            now = time.monotonic()
+            return {
+                "hedged": self.hedged,
+                "hedge_wins": self.hedge_wins,
+                "backends": [{
+                    "name": backend.name(),
+                    "overflow": backend.overflow,
+                    "requests": backend.requests,
+                    "successes": backend.successes,
+                    "failures": backend.failures,
+                    "ejections": backend.ejections,
+                    "ejected_seconds_left": round(max(0.0, backend.ejected_until - now), 2),
+                    "latency_ewma": round(backend.latency, 4) if backend.latency is not None else None,
+                    "error_rate_ewma": round(backend.error_rate, 4),
+                } for backend in self.backends],
+            }
+
+    def close(self):
+        if self._executor:
+            self._executor.shutdown(wait=False)
+        for backend in self.backends:
+            if hasattr(backend.model, "close"):
+                backend.model.close()
@@ -1,54 +1,161 @@
-import requests
-import simplejson
 import time
 import os
 import openai
+import tiktoken
 
+from collections import deque
 from model import Model
+from model.rate_limiter import get_rate_limiter, backoff_delay, parse_duration
 from utils import LOG
 from openai import OpenAI
 
+# 各模型的上下文窗口大小（输入与输出 token 之和）
+CONTEXT_WINDOWS = {
+    "gpt-3.5-turbo": 4096,
+    "gpt-3.5-turbo-16k": 16385,
+    "gpt-3.5-turbo-instruct": 4096,
+    "gpt-4": 8192,
+    "gpt-4-32k": 32768,
+    "text-davinci-003": 4097,
+}
+
 class OpenAIModel(Model):
-    def __init__(self, model: str, api_key: str):
+    def __init__(self, model: str, api_key: str, rpm: int = 3500, tpm: int = 90000, max_retries: int = 5):
         self.model = model
         self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        self.max_retries = max_retries
+        self.rate_limiter = get_rate_limiter(f"OpenAIModel:{model}", rpm, tpm)
+        # 流式请求的首个 token 耗时和总耗时（秒）
+        self.stream_metrics = {"first_token_seconds": deque(maxlen=1000), "total_seconds": deque(maxlen=1000)}
+        try:
+            self.encoding = tiktoken.encoding_for_model(model)
+        except KeyError:
+            self.encoding = tiktoken.get_encoding("cl100k_base")
+
+    def model_name(self) -> str:
+        return f"OpenAIModel:{self.model}"
+
+    def context_window(self) -> int:
+        return CONTEXT_WINDOWS.get(self.model, 4096)
+
+    def count_tokens(self, text: str) -> int:
+        return len(self.encoding.encode(text))
+
+    def max_output_tokens(self, prompt: str) -> int:
+        # 按输入长度估算译文所需的 token 数，但不超过上下文窗口的剩余空间
+        prompt_tokens = len(self.encoding.encode(prompt))
+        return max(1, min(self.context_window() - prompt_tokens, 2 * prompt_tokens + 64))
+
+    def estimate_tokens(self, prompt: str) -> int:
+        # 译文长度与原文相近，按提示词 token 数的两倍估算本次请求的总消耗
+        return 2 * len(self.encoding.encode(prompt))
+
+    def make_batch_request(self, prompt: str) -> dict:
+        # 与 make_request 使用相同的接口和参数，保证离线翻译与在线翻译结果一致
+        if self.model == "gpt-3.5-turbo":
+            return {
+                "url": "/v1/chat/completions",
+                "body": {"model": self.model, "messages": [{"role": "user", "content": prompt}]},
+            }
+        return {
+            "url": "/v1/completions",
+            "body": {"model": self.model, "prompt": prompt,
+                     "max_tokens": self.max_output_tokens(prompt), "temperature": 0},
+        }
+
+    def make_stream_request(self, prompt):
+        """流式请求，译文片段一到达就立即 yield；只在收到第一个片段之前重试。"""
+        for attempt in range(self.max_retries):
+            self.rate_limiter.acquire(self.estimate_tokens(prompt))
+            start_time = time.perf_counter()
+            first_token_seconds = None
+            try:
+                if self.model == "gpt-3.5-turbo":
+                    stream = self.client.chat.completions.create(
+                        model=self.model,
+                        messages=[
+                            {"role": "user", "content": prompt}
+                        ],
+                        stream=True
+                    )
+                else:
+                    stream = self.client.completions.create(
+                        model=self.model,
+                        prompt=prompt,
+                        max_tokens=self.max_output_tokens(prompt),
+                        temperature=0,
+                        stream=True
+                    )
+
+                for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    choice = chunk.choices[0]
+                    delta = choice.delta.content if self.model == "gpt-3.5-turbo" else choice.text
+                    if not delta:
+                        continue
+                    if first_token_seconds is None:
+                        first_token_seconds = time.perf_counter() - start_time
+                        self.stream_metrics["first_token_seconds"].append(first_token_seconds)
+                        LOG.debug(f"首个 token 耗时 {first_token_seconds:.3f} 秒")
+                    yield delta
+                self.stream_metrics["total_seconds"].append(time.perf_counter() - start_time)
+                return
+            except (openai.RateLimitError, openai.APIConnectionError, openai.APITimeoutError) as e:
+                # 已经输出过的片段无法撤回，此时只能放弃
+                if first_token_seconds is not None:
+                    raise Exception(f"流式输出中断：{e}")
+                delay = backoff_delay(attempt)
+                if isinstance(e, openai.RateLimitError):
+                    self.rate_limiter.pause(delay)
+                LOG.warning(f"Stream request failed: {e}. Retrying in {delay:.2f} seconds ({attempt + 1}/{self.max_retries}).")
+                time.sleep(delay)
+            except openai.APIStatusError as e:
+                raise Exception(f"请求被拒绝，状态码 {e.status_code}：{e.message}")
+        raise Exception("Maximum attempts exceeded.")
 
     def make_request(self, prompt):
-        attempts = 0
-        while attempts < 3:
+        for attempt in range(self.max_retries):
+            self.rate_limiter.acquire(self.estimate_tokens(prompt))
             try:
                 if self.model == "gpt-3.5-turbo":
-                    response = self.client.chat.completions.create(
+                    raw_response = self.client.chat.completions.with_raw_response.create(
                         model=self.model,
                         messages=[
                             {"role": "user", "content": prompt}
                         ]
                     )
+                    response = raw_response.parse()
                     translation = response.choices[0].message.content.strip()
                 else:
-                    response = self.client.completions.create(
+                    raw_response = self.client.completions.with_raw_response.create(
                         model=self.model,
                         prompt=prompt,
-                        max_tokens=150,
+                        max_tokens=self.max_output_tokens(prompt),
                         temperature=0
                     )
+                    response = raw_response.parse()
                     translation = response.choices[0].text.strip()
 
+                self.rate_limiter.update_from_headers(raw_response.headers)
                 return translation, True
             except openai.RateLimitError as e:
-                attempts += 1
-                if attempts < 3:
-                    LOG.warning("Rate limit reached. Waiting for 60 seconds before retrying.")
-                    time.sleep(60)
-                else:
-                    raise Exception("Rate limit reached. Maximum attempts exceeded.")
-            except openai.APIConnectionError as e:
-                print("The server could not be reached")
-                print(e.__cause__)  # an underlying Exception, likely raised within httpx.            except requests.exceptions.Timeout as e:
+                # 优先遵循服务端给出的等待时间
+                headers = e.response.headers if e.response is not None else {}
+                delay = parse_duration(headers.get("retry-after") or headers.get("x-ratelimit-reset-requests")) \
+                    or backoff_delay(attempt)
+                LOG.warning(f"Rate limit reached. Waiting for {delay:.2f} seconds before retrying ({attempt + 1}/{self.max_retries}).")
+                self.rate_limiter.pause(delay)
+            except (openai.APIConnectionError, openai.APITimeoutError) as e:
+                delay = backoff_delay(attempt)
+                LOG.warning(f"The server could not be reached: {e.__cause__ or e}. Retrying in {delay:.2f} seconds ({attempt + 1}/{self.max_retries}).")
+                time.sleep(delay)
             except openai.APIStatusError as e:
-                print("Another non-200-range status code was received")
-                print(e.status_code)
-                print(e.response)
+                if e.status_code < 500:
+                    raise Exception(f"请求被拒绝，状态码 {e.status_code}：{e.message}")
+                delay = backoff_delay(attempt)
+                LOG.warning(f"Server error {e.status_code}. Retrying in {delay:.2f} seconds ({attempt + 1}/{self.max_retries}).")
+                time.sleep(delay)
             except Exception as e:
                 raise Exception(f"发生了未知错误：{e}")
-        return "", False
+        raise Exception("Maximum attempts exceeded.")
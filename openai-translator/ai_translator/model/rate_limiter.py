@@ -0,0 +1,119 @@
+import random
+import re
+import threading
+import time
+
+from utils import LOG
+
+_DURATION_PATTERN = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+
+
+def parse_duration(value: str) -> float:
+    """解析 OpenAI 限流响应头中的时长，例如 "20ms"、"1s"、"6m0s"。"""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        pass
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in _DURATION_PATTERN.findall(value or ""))
+
+
+def backoff_delay(attempt: int, base: float = 1.0, cap: float = 60.0) -> float:
+    """带完全随机抖动的指数退避，避免多个线程在同一时刻集中重试。"""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class RateLimiter:
+    """按每分钟请求数（RPM）和每分钟 token 数（TPM）限流的令牌桶，进程内所有线程共享。"""
+
+    def __init__(self, rpm: int, tpm: int):
+        # 0 表示不限制对应的额度
+        self.rpm = rpm
+        self.tpm = tpm
+        self._available_requests = float(rpm)
+        self._available_tokens = float(tpm)
+        self._paused_until = 0.0
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+        self.acquired = 0
+        self.throttled = 0
+        self.total_wait_seconds = 0.0
+
+    def _refill(self, now: float):
+        elapsed = now - self._last_refill
+        self._last_refill = now
+        if self.rpm:
+            self._available_requests = min(self.rpm, self._available_requests + elapsed * self.rpm / 60)
+        if self.tpm:
+            self._available_tokens = min(self.tpm, self._available_tokens + elapsed * self.tpm / 60)
+
+    def acquire(self, tokens: int):
+        # 单个请求超过桶容量时按满桶处理，否则永远等不到
+        tokens = min(tokens, self.tpm) if self.tpm else 0
+        start_time = time.monotonic()
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                requests_ok = not self.rpm or self._available_requests >= 1
+                tokens_ok = not self.tpm or self._available_tokens >= tokens
+                if now >= self._paused_until and requests_ok and tokens_ok:
+                    if self.rpm:
+                        self._available_requests -= 1
+                    if self.tpm:
+                        self._available_tokens -= tokens
+                    self.acquired += 1
+                    self.total_wait_seconds += now - start_time
+                    return
+                wait = max(
+                    self._paused_until - now,
+                    (1 - self._available_requests) * 60 / self.rpm if self.rpm else 0,
+                    (tokens - self._available_tokens) * 60 / self.tpm if self.tpm else 0,
+                )
+            time.sleep(max(wait, 0.01))
+
+    def pause(self, seconds: float):
+        """收到 429 或 Retry-After 后，让所有线程在这段时间内暂停发送请求。"""
+        with self._lock:
+            self.throttled += 1
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def update_from_headers(self, headers):
+        """用服务端返回的剩余额度校准本地令牌桶。"""
+        if not headers:
+            return
+        remaining_requests = headers.get("x-ratelimit-remaining-requests")
+        remaining_tokens = headers.get("x-ratelimit-remaining-tokens")
+        with self._lock:
+            if remaining_requests is not None:
+                self._available_requests = min(self._available_requests, float(remaining_requests))
+            if remaining_tokens is not None:
+                self._available_tokens = min(self._available_tokens, float(remaining_tokens))
+
+    def metrics(self) -> dict:
+        with self._lock:
+            self._refill(time.monotonic())
+            return {
+                "rpm": self.rpm,
+                "tpm": self.tpm,
+                "available_requests": round(self._available_requests, 2),
+                "available_tokens": round(self._available_tokens, 2),
+                "paused_seconds": round(max(0.0, self._paused_until - time.monotonic()), 2),
+                "acquired": self.acquired,
+                "throttled": self.throttled,
+                "total_wait_seconds": round(self.total_wait_seconds, 2),
+            }
+
+
+_shared_limiters = {}
+_shared_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(name: str, rpm: int, tpm: int) -> RateLimiter:
+    """按名称返回进程内共享的限流器，同一个 API key / 模型的所有请求共用一份额度。"""
+    with _shared_limiters_lock:
+        if name not in _shared_limiters:
+            LOG.debug(f"创建限流器 {name}: rpm={rpm}, tpm={tpm}")
+            _shared_limiters[name] = RateLimiter(rpm, tpm)
+        return _shared_limiters[name]
@@ -1 +1,2 @@
-from .pdf_translator import PDFTranslator
\ No newline at end of file
+from .pdf_translator import PDFTranslator
+from .translation_cache import TranslationCache
\ No newline at end of file
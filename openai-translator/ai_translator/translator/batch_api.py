@@ -0,0 +1,48 @@
+import json
+import os
+from typing import Dict, Tuple
+
+from utils import LOG
+
+
+def write_batch_requests(requests_file: str, batch_requests) -> int:
+    """batch_requests 为 (custom_id, url, body) 列表，按 OpenAI Batch API 的 JSONL 格式写出。"""
+    requests_dir = os.path.dirname(requests_file)
+    if requests_dir and not os.path.exists(requests_dir):
+        os.makedirs(requests_dir)
+
+    with open(requests_file, "w", encoding="utf-8") as f:
+        for custom_id, url, body in batch_requests:
+            f.write(json.dumps({"custom_id": custom_id, "method": "POST", "url": url, "body": body},
+                               ensure_ascii=False) + "\n")
+    LOG.info(f"已写出 {len(batch_requests)} 个批量请求: {requests_file}")
+    return len(batch_requests)
+
+
+def _response_text(body: dict) -> str:
+    choice = body["choices"][0]
+    if "message" in choice:
+        return choice["message"]["content"].strip()
+    return choice["text"].strip()
+
+
+def load_batch_results(results_file: str) -> Dict[str, Tuple[str, bool]]:
+    """读取 Batch API 的结果 JSONL，返回 custom_id -> (译文, 是否成功)。"""
+    results = {}
+    with open(results_file, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            custom_id = entry["custom_id"]
+            response = entry.get("response") or {}
+            if entry.get("error") or response.get("status_code") != 200:
+                LOG.warning(f"批量请求 {custom_id} 失败: {entry.get('error') or response.get('status_code')}")
+                results[custom_id] = ("", False)
+                continue
+            try:
+                results[custom_id] = (_response_text(response["body"]), True)
+            except (KeyError, IndexError, TypeError) as e:
+                LOG.warning(f"批量请求 {custom_id} 的返回格式无法解析: {e}")
+                results[custom_id] = ("", False)
+    return results
@@ -1,4 +1,3 @@
-import pdfplumber
 from typing import Optional
 from book import Book, Page, Content, ContentType, TableContent
 from translator.exceptions import PageOutOfRangeException
@@ -10,6 +9,8 @@ class PDFParser:
         pass
 
     def parse_pdf(self, pdf_file_path: str, pages: Optional[int] = None) -> Book:
+        import pdfplumber
+
         book = Book(pdf_file_path)
 
         with pdfplumber.open(pdf_file_path) as pdf:
@@ -24,15 +25,17 @@ class PDFParser:
             for pdf_page in pages_to_parse:
                 page = Page()
 
-                # Store the original text content
-                raw_text = pdf_page.extract_text()
-                tables = pdf_page.extract_tables()
+                # 每页只检测一次表格区域，正文只从表格区域之外的字符中提取
+                found_tables = pdf_page.find_tables()
+                tables = [[["" if cell is None else cell for cell in row] for row in found_table.extract()]
+                          for found_table in found_tables]
 
-                # Remove each cell's content from the original text
-                for table_data in tables:
-                    for row in table_data:
-                        for cell in row:
-                            raw_text = raw_text.replace(cell, "", 1)
+                # Store the original text content
+                if found_tables:
+                    bboxes = [found_table.bbox for found_table in found_tables]
+                    raw_text = pdf_page.filter(_outside_bboxes(bboxes)).extract_text()
+                else:
+                    raw_text = pdf_page.extract_text()
 
                 # Handling text
                 if raw_text:
@@ -56,3 +59,12 @@ class PDFParser:
                 book.add_page(page)
 
         return book
+
+
+def _outside_bboxes(bboxes):
+    """返回一个过滤函数：对象中心点不落在任何表格区域内时保留。"""
+    def predicate(obj):
+        x = (obj["x0"] + obj["x1"]) / 2
+        y = (obj["top"] + obj["bottom"]) / 2
+        return not any(x0 <= x <= x1 and top <= y <= bottom for x0, top, x1, bottom in bboxes)
+    return predicate
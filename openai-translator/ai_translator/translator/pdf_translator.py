@@ -1,26 +1,167 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
+from book import ContentType
 from model import Model
+from translator.batch_api import write_batch_requests, load_batch_results
 from translator.pdf_parser import PDFParser
+from translator.table_translator import TableCellTranslator
+from translator.text_chunker import TextChunker
+from translator.translation_cache import TranslationCache
 from translator.writer import Writer
 from utils import LOG
 
 class PDFTranslator:
-    def __init__(self, model: Model):
+    def __init__(self, model: Model, max_workers: int = 1, cache: Optional[TranslationCache] = None, table_mode: str = "cells"):
         self.model = model
+        self.max_workers = max(1, max_workers)
+        self.cache = cache
+        # cells: 按单元格去重翻译表格；table: 整表作为一个提示词
+        self.table_mode = table_mode
+        self._chunker = None
+        self._table_translator = None
         self.pdf_parser = PDFParser()
         self.writer = Writer()
 
-    def translate_pdf(self, pdf_file_path: str, file_format: str = 'PDF', target_language: str = '中文', output_file_path: str = None, pages: Optional[int] = None):
+    @property
+    def chunker(self) -> TextChunker:
+        # 第一次切分时才创建，构造 PDFTranslator 不需要加载分词器
+        if self._chunker is None:
+            self._chunker = TextChunker(self.model.context_window(), self.model.count_tokens)
+        return self._chunker
+
+    @property
+    def table_translator(self) -> TableCellTranslator:
+        if self._table_translator is None:
+            self._table_translator = TableCellTranslator(self.model, self.chunker)
+        return self._table_translator
+
+    def translate_pdf(self, pdf_file_path: str, file_format: str = 'PDF', target_language: str = '中文', output_file_path: str = None, pages: Optional[int] = None,
+                      batch_requests_file: Optional[str] = None, batch_results_file: Optional[str] = None):
+        """batch_requests_file: 只导出 Batch API 请求文件，不调用模型；
+        batch_results_file: 用 Batch API 的结果文件代替在线请求，写回 Book 后导出。"""
         self.book = self.pdf_parser.parse_pdf(pdf_file_path, pages)
 
-        for page_idx, page in enumerate(self.book.pages):
-            for content_idx, content in enumerate(page.contents):
-                prompt = self.model.translate_prompt(content, target_language)
-                LOG.debug(prompt)
-                translation, status = self.model.make_request(prompt)
-                LOG.info(translation)
-                
-                # Update the content in self.book.pages directly
-                self.book.pages[page_idx].contents[content_idx].set_translation(translation, status)
+        # 批量 API 模式下表格仍按整表导出，保证请求与结果一一对应
+        cell_mode = self.table_mode == "cells" and not (batch_requests_file or batch_results_file)
+        contents, requests = self._build_requests(target_language, include_tables=not cell_mode)
+        if len(requests) > len(contents):
+            LOG.info(f"超长文本被切分，{len(contents)} 个内容块共需 {len(requests)} 次请求")
+
+        if batch_requests_file:
+            return self._export_batch_requests(requests, batch_requests_file, target_language)
+
+        start_time = time.perf_counter()
+        if batch_results_file:
+            results = self._apply_batch_results(requests, batch_results_file, target_language)
+        elif self.max_workers > 1:
+            # 并发发送请求，executor.map 按提交顺序返回结果，保证页面和内容的顺序
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                results = list(executor.map(lambda request: self._translate_prompt(request[2], request[3], target_language), requests))
+                if cell_mode:
+                    self._translate_tables(target_language, executor.map)
+        else:
+            results = [self._translate_prompt(content, prompt, target_language) for _, _, content, prompt in requests]
+            if cell_mode:
+                self._translate_tables(target_language, map)
+        elapsed = time.perf_counter() - start_time
+
+        # 按原顺序拼接各片段的译文
+        translations = [[] for _ in contents]
+        statuses = [True] * len(contents)
+        for (_, content_idx, _, _), (translation, status) in zip(requests, results):
+            translations[content_idx].append(translation)
+            statuses[content_idx] = statuses[content_idx] and status
+
+        for content, parts, status in zip(contents, translations, statuses):
+            # Update the content in self.book.pages directly
+            content.set_translation("\n".join(parts), status)
+
+        LOG.info(f"翻译了 {len(contents)} 个内容块，耗时 {elapsed:.2f} 秒，吞吐量 {len(contents) / max(elapsed, 1e-9):.2f} blocks/s (max_workers={self.max_workers})")
+
+        if self.cache:
+            self.cache.log_stats()
 
         self.writer.save_translated_book(self.book, output_file_path, file_format)
+
+    def _translate_tables(self, target_language: str, map_fn):
+        tables = [content for page in self.book.pages for content in page.contents
+                  if content.content_type == ContentType.TABLE]
+        self.table_translator.translate_tables(tables, target_language, self._translate_prompt, map_fn)
+
+    def _build_requests(self, target_language: str, include_tables: bool = True):
+        """返回内容块列表和请求列表 (custom_id, content_idx, content, prompt)。
+
+        custom_id 由页号、块号和切片号组成，同一本书重新解析后保持不变，用于匹配 Batch API 的结果。
+        """
+        contents, requests = [], []
+        for page_idx, page in enumerate(self.book.pages):
+            for block_idx, content in enumerate(page.contents):
+                if content.content_type == ContentType.TABLE and not include_tables:
+                    continue
+                content_idx = len(contents)
+                contents.append(content)
+                # 超长文本按上下文窗口切分成多个请求，表格保持为一个请求
+                if content.content_type == ContentType.TEXT:
+                    prompts = [self.model.make_text_prompt(chunk, target_language) for chunk in self.chunker.split(content.original)]
+                else:
+                    prompts = [self.model.translate_prompt(content, target_language)]
+                for chunk_idx, prompt in enumerate(prompts):
+                    requests.append((f"p{page_idx}-c{block_idx}-k{chunk_idx}", content_idx, content, prompt))
+        return contents, requests
+
+    def _export_batch_requests(self, requests, batch_requests_file: str, target_language: str) -> str:
+        # 缓存中已有译文的提示词不再提交
+        batch_requests = []
+        for custom_id, _, content, prompt in requests:
+            if self._get_cached(content, prompt, target_language)[1] is not None:
+                continue
+            batch_request = self.model.make_batch_request(prompt)
+            batch_requests.append((custom_id, batch_request["url"], batch_request["body"]))
+        LOG.info(f"{len(requests)} 个请求中 {len(requests) - len(batch_requests)} 个已命中缓存")
+        write_batch_requests(batch_requests_file, batch_requests)
+        return batch_requests_file
+
+    def _apply_batch_results(self, requests, batch_results_file: str, target_language: str):
+        batch_results = load_batch_results(batch_results_file)
+        results, missing = [], 0
+        for custom_id, _, content, prompt in requests:
+            cache_key, cached = self._get_cached(content, prompt, target_language)
+            if custom_id in batch_results:
+                translation, status = batch_results[custom_id]
+                if cache_key and status:
+                    self.cache.set(cache_key, translation)
+                results.append((translation, status))
+            elif cached is not None:
+                results.append((cached, True))
+            else:
+                missing += 1
+                results.append(("", False))
+        if missing:
+            LOG.warning(f"结果文件 {batch_results_file} 缺少 {missing} 个请求的译文")
+        return results
+
+    def _get_cached(self, content, prompt: str, target_language: str):
+        # 提示词本身已包含模板与目标语言，直接作为缓存原文
+        if not self.cache:
+            return None, None
+        cache_key = self.cache.make_key(self.model.model_name(), "", target_language, content.content_type.name, prompt)
+        return cache_key, self.cache.get(cache_key)
+
+    def _translate_prompt(self, content, prompt: str, target_language: str):
+        LOG.debug(prompt)
+
+        cache_key, cached = self._get_cached(content, prompt, target_language)
+        if cached is not None:
+            return cached, True
+
+        # 单个内容块失败只标记该块，不影响整本书其余已完成的译文
+        try:
+            translation, status = self.model.make_request(prompt)
+        except Exception as e:
+            LOG.error(f"An error occurred during translation: {e}")
+            return "", False
+        LOG.info(translation)
+        if cache_key and status:
+            self.cache.set(cache_key, translation)
+        return translation, status
@@ -0,0 +1,105 @@
+import re
+
+from typing import Callable, Dict, List, Tuple
+from model import Model
+from translator.text_chunker import TextChunker
+from utils import LOG
+
+# 纯数字、金额、百分比、日期等单元格不需要翻译
+NUMERIC_CELL = re.compile(r"^[\s$€£¥%+\-–—.,:/()#*\d]*$")
+NUMBERED_LINE = re.compile(r"^\s*(\d+)\s*[.、:：)]\s?(.*)$")
+
+
+class TableCellTranslator:
+    """按单元格翻译全书的表格：相同的值只翻译一次，数字直接保留，其余按编号列表分批请求。"""
+
+    def __init__(self, model: Model, chunker: TextChunker):
+        self.model = model
+        self.chunker = chunker
+        self.stats = {}
+
+    @staticmethod
+    def collect_cells(tables) -> Dict[str, List[Tuple[int, int, int, int]]]:
+        """返回单元格值 -> [(TableContent 序号, 表格, 行, 列)]，跳过空单元格和数字。"""
+        cells = {}
+        for content_idx, content in enumerate(tables):
+            for table_idx, table in enumerate(content.iter_tables()):
+                for row_idx, row in enumerate(table):
+                    for col_idx, value in enumerate(row):
+                        value = value.strip()
+                        if NUMERIC_CELL.match(value):
+                            continue
+                        cells.setdefault(value, []).append((content_idx, table_idx, row_idx, col_idx))
+        return cells
+
+    def make_batches(self, values: List[str], target_language: str) -> List[List[str]]:
+        batches, current = [], []
+        for value in values:
+            candidate = current + [value]
+            if current and self.chunker.count_tokens(self.model.make_cells_prompt(candidate, target_language)) > self.chunker.max_chunk_tokens:
+                batches.append(current)
+                candidate = [value]
+            current = candidate
+        if current:
+            batches.append(current)
+        return batches
+
+    @staticmethod
+    def parse_reply(reply: str, count: int) -> Dict[int, str]:
+        translations = {}
+        for line in reply.splitlines():
+            match = NUMBERED_LINE.match(line)
+            if match and 1 <= int(match.group(1)) <= count:
+                translations[int(match.group(1)) - 1] = match.group(2).strip()
+        return translations
+
+    def translate_tables(self, tables, target_language: str, translate_fn: Callable, map_fn: Callable = map):
+        """translate_fn(content, prompt, target_language) -> (译文, 状态)；map_fn 用于并发发送各批请求。"""
+        if not tables:
+            return
+        cells = self.collect_cells(tables)
+        values = list(cells)
+        batches = self.make_batches(values, target_language)
+
+        def translate_batch(batch):
+            translation, status = translate_fn(tables[0], self.model.make_cells_prompt(batch, target_language), target_language)
+            return self.parse_reply(translation, len(batch)) if status else {}
+
+        translated_values = {}
+        for batch, parsed in zip(batches, map_fn(translate_batch, batches)):
+            missing = [idx for idx in range(len(batch)) if idx not in parsed]
+            if missing:
+                LOG.warning(f"表格单元格译文缺少 {len(missing)}/{len(batch)} 项，保留原文")
+            for idx, translation in parsed.items():
+                translated_values[batch[idx]] = translation
+
+        per_table = [{} for _ in tables]
+        for value, translation in translated_values.items():
+            for content_idx, table_idx, row_idx, col_idx in cells[value]:
+                per_table[content_idx][(table_idx, row_idx, col_idx)] = translation
+        # 有需要翻译的单元格却一个译文都没拿到时，视为整表翻译失败
+        status = bool(translated_values) or not cells
+        for table, table_cells in zip(tables, per_table):
+            table.set_translated_cells(table_cells, status)
+
+        self._record_stats(tables, cells, batches, target_language)
+
+    def _record_stats(self, tables, cells, batches, target_language: str):
+        # 与整表 to_string 提示词相比节省的输入 token
+        baseline_tokens = sum(self.chunker.count_tokens(self.model.translate_prompt(table, target_language)) for table in tables)
+        cell_tokens = sum(self.chunker.count_tokens(self.model.make_cells_prompt(batch, target_language)) for batch in batches)
+        real_tables = [table for content in tables for table in content.iter_tables()]
+        table_count = len(real_tables)
+        total_cells = sum(len(row) for table in real_tables for row in table)
+        self.stats = {
+            "tables": table_count,
+            "cells": total_cells,
+            "unique_cells": len(cells),
+            "skipped_cells": total_cells - sum(len(coords) for coords in cells.values()),
+            "requests": len(batches),
+            "baseline_prompt_tokens": baseline_tokens,
+            "prompt_tokens": cell_tokens,
+            "saved_tokens": baseline_tokens - cell_tokens,
+        }
+        LOG.info(f"表格单元格翻译: {table_count} 个表格 {total_cells} 个单元格，去重后 {len(cells)} 个，"
+                 f"{len(batches)} 次请求，提示词 {cell_tokens} tokens（整表方式 {baseline_tokens} tokens，节省 {baseline_tokens - cell_tokens}）")
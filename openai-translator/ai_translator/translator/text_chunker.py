@@ -0,0 +1,67 @@
+import re
+
+from typing import Callable, List
+
+# 译文（尤其是中文）的 token 数通常多于原文，按原文的两倍为输出预留空间
+OUTPUT_TOKEN_RATIO = 2
+# 为提示词模板本身预留的 token 数
+PROMPT_OVERHEAD_TOKENS = 100
+
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?。！？;；])\s+")
+
+
+class TextChunker:
+    """按段落、行、句子的边界把超长文本切分成适合模型上下文窗口的片段。"""
+
+    def __init__(self, context_window: int, count_tokens: Callable[[str], int]):
+        # count_tokens 由模型提供，各模型使用自己的分词方式
+        self.max_chunk_tokens = max(1, (context_window - PROMPT_OVERHEAD_TOKENS) // (1 + OUTPUT_TOKEN_RATIO))
+        self.count_tokens = count_tokens
+
+    def split(self, text: str) -> List[str]:
+        if self.count_tokens(text) <= self.max_chunk_tokens:
+            return [text]
+        return self._split_recursive(text, ["\n\n", "\n", SENTENCE_BOUNDARY, " "])
+
+    def _split_recursive(self, text: str, separators) -> List[str]:
+        if self.count_tokens(text) <= self.max_chunk_tokens:
+            return [text]
+        if not separators:
+            return self._split_by_length(text)
+
+        separator, rest = separators[0], separators[1:]
+        if isinstance(separator, str):
+            units, joiner = text.split(separator), separator
+        else:
+            units, joiner = separator.split(text), " "
+        if len(units) == 1:
+            return self._split_recursive(text, rest)
+
+        # 贪心合并相邻单元，单个单元仍然超长时再用更细的分隔符切分
+        chunks, current = [], ""
+        for unit in units:
+            candidate = f"{current}{joiner}{unit}" if current else unit
+            if self.count_tokens(candidate) <= self.max_chunk_tokens:
+                current = candidate
+                continue
+            if current:
+                chunks.append(current)
+            if self.count_tokens(unit) <= self.max_chunk_tokens:
+                current = unit
+            else:
+                chunks.extend(self._split_recursive(unit, rest))
+                current = ""
+        if current:
+            chunks.append(current)
+        return chunks
+
+    def _split_by_length(self, text: str) -> List[str]:
+        # 没有任何分隔符时按字符切分，片段仍超长就减半，直到不超过 max_chunk_tokens
+        chunks, start = [], 0
+        while start < len(text):
+            size = self.max_chunk_tokens
+            while size > 1 and self.count_tokens(text[start:start + size]) > self.max_chunk_tokens:
+                size //= 2
+            chunks.append(text[start:start + size])
+            start += size
+        return chunks
@@ -0,0 +1,93 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from utils import LOG
+
+
+class TranslationCache:
+    """基于 SQLite 的持久化翻译记忆，按模型、语言、提示模板和规范化后的原文建立索引。"""
+
+    def __init__(self, db_path: str = "cache/translation_cache.db", max_entries: int = 100000):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        db_dir = os.path.dirname(db_path)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir)
+
+        # 翻译线程共享同一个连接，读写由锁串行化
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS translations ("
+            "key TEXT PRIMARY KEY, translation TEXT NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_last_access ON translations(last_access)")
+        self._conn.commit()
+        self._count = self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        return re.sub(r"\s+", " ", str(text)).strip()
+
+    def make_key(self, model_name: str, source_language: str, target_language: str, template: str, text: str) -> str:
+        raw = "\x1f".join([model_name, source_language, target_language, template, self.normalize(text)])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str):
+        with self._lock:
+            row = self._conn.execute("SELECT translation FROM translations WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._conn.execute("UPDATE translations SET last_access = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+            return row[0]
+
+    def set(self, key: str, translation: str):
+        with self._lock:
+            now = time.time()
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO translations (key, translation, last_access) VALUES (?, ?, ?)",
+                (key, translation, now))
+            if cursor.rowcount:
+                self._count += 1
+                self._evict()
+            else:
+                self._conn.execute(
+                    "UPDATE translations SET translation = ?, last_access = ? WHERE key = ?",
+                    (translation, now, key))
+            self._conn.commit()
+
+    def _evict(self):
+        # 超出容量时淘汰最久未访问的条目
+        overflow = self._count - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM translations WHERE key IN "
+                "(SELECT key FROM translations ORDER BY last_access ASC LIMIT ?)", (overflow,))
+            self._count -= overflow
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+    def log_stats(self):
+        stats = self.stats()
+        LOG.info(f"翻译缓存: 命中 {stats['hits']} 次，未命中 {stats['misses']} 次，命中率 {stats['hit_rate']:.1%}")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -1,11 +1,4 @@
 import os
-from reportlab.lib import colors, pagesizes, units
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
-from reportlab.platypus import (
-    SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
-)
 
 from book import Book, ContentType
 from utils import LOG
@@ -23,6 +16,15 @@ class Writer:
             raise ValueError(f"Unsupported file format: {file_format}")
 
     def _save_translated_book_pdf(self, book: Book, output_file_path: str = None):
+        # reportlab 只在导出 PDF 时才导入
+        from reportlab.lib import colors, pagesizes
+        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+        from reportlab.pdfbase import pdfmetrics
+        from reportlab.pdfbase.ttfonts import TTFont
+        from reportlab.platypus import (
+            SimpleDocTemplate, Paragraph, Table, TableStyle, PageBreak
+        )
+
         if output_file_path is None:
             output_file_path = book.pdf_file_path.replace('.pdf', f'_translated.pdf')
 
@@ -4,13 +4,18 @@ class ArgumentParser:
     def __init__(self):
         self.parser = argparse.ArgumentParser(description='Translate English PDF book to Chinese.')
         self.parser.add_argument('--config', type=str, default='config.yaml', help='Configuration file with model and API settings.')
-        self.parser.add_argument('--model_type', type=str, required=True, choices=['GLMModel', 'OpenAIModel'], help='The type of translation model to use. Choose between "GLMModel" and "OpenAIModel".')        
+        self.parser.add_argument('--model_type', type=str, required=True, choices=['GLMModel', 'OpenAIModel', 'ModelPool'], help='The type of translation model to use. Choose between "GLMModel", "OpenAIModel" and "ModelPool" (backends listed in the config file).')        
         self.parser.add_argument('--glm_model_url', type=str, help='The URL of the ChatGLM model URL.')
         self.parser.add_argument('--timeout', type=int, help='Timeout for the API request in seconds.')
         self.parser.add_argument('--openai_model', type=str, help='The model name of OpenAI Model. Required if model_type is "OpenAIModel".')
         self.parser.add_argument('--openai_api_key', type=str, help='The API key for OpenAIModel. Required if model_type is "OpenAIModel".')
         self.parser.add_argument('--book', type=str, help='PDF file to translate.')
         self.parser.add_argument('--file_format', type=str, help='The file format of translated book. Now supporting PDF and Markdown')
+        self.parser.add_argument('--batch_requests', type=str, help='Write every prompt to this Batch API request JSONL instead of calling the model.')
+        self.parser.add_argument('--batch_results', type=str, help='Apply translations from this Batch API result JSONL instead of calling the model.')
+        self.parser.add_argument('--table_mode', type=str, choices=['cells', 'table'], help='Translate tables cell by cell with deduplication ("cells") or as one whole-table prompt ("table").')
+        self.parser.add_argument('--no_cache', action='store_true', help='Bypass the persistent translation cache.')
+        self.parser.add_argument('--max_workers', type=int, help='Maximum number of translation requests in flight at the same time. 1 means sequential.')
 
     def parse_arguments(self):
         args = self.parser.parse_args()
@@ -0,0 +1,61 @@
+"""Batch API 的本地替身：读取请求 JSONL，按 OpenAI Batch API 的输出格式生成结果 JSONL。
+
+用法（在 openai-translator 目录下）：
+    python benchmarks/batch_stub.py --requests batch/test_requests.jsonl --results batch/test_results.jsonl
+"""
+import argparse
+import json
+import random
+import re
+
+TABLE_PROMPT = "以表格形式返回：\n"
+TABLE_ROW = re.compile(r"\[([^\]]*)\]")
+
+
+def _fake_table(table: str) -> str:
+    # 像模型一样每行一个表格行、单元格以空格分隔；单元格内的空格去掉，保证 TableContent 按空白拆分后列数一致
+    rows = [[cell.strip().replace(" ", "") or "-" for cell in row.split(",")] for row in TABLE_ROW.findall(table)]
+    return "\n".join(" ".join(row) for row in rows)
+
+
+def _fake_translation(body: dict) -> str:
+    prompt = body["messages"][-1]["content"] if "messages" in body else body["prompt"]
+    if TABLE_PROMPT in prompt:
+        return _fake_table(prompt.split(TABLE_PROMPT, 1)[1])
+    return f"[stub] {prompt}"
+
+
+def make_batch_results(requests_file: str, results_file: str, failure_rate: float = 0.0, seed: int = 0) -> int:
+    rng = random.Random(seed)
+    lines = []
+    with open(requests_file, "r", encoding="utf-8") as f:
+        for idx, line in enumerate(f):
+            request = json.loads(line)
+            body = request["body"]
+            if rng.random() < failure_rate:
+                response = {"status_code": 500, "request_id": f"req_{idx}", "body": {"error": {"message": "stub failure"}}}
+            elif request["url"] == "/v1/chat/completions":
+                response = {"status_code": 200, "request_id": f"req_{idx}", "body": {
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": _fake_translation(body)}}]}}
+            else:
+                response = {"status_code": 200, "request_id": f"req_{idx}", "body": {
+                    "choices": [{"index": 0, "text": _fake_translation(body)}]}}
+            lines.append({"id": f"batch_req_{idx}", "custom_id": request["custom_id"], "response": response, "error": None})
+
+    # 真实的 Batch API 不保证结果顺序，这里同样打乱，验证按 custom_id 匹配
+    rng.shuffle(lines)
+    with open(results_file, "w", encoding="utf-8") as f:
+        for line in lines:
+            f.write(json.dumps(line, ensure_ascii=False) + "\n")
+    return len(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Produce a Batch API result file from a request file without calling any model.")
+    parser.add_argument("--requests", type=str, required=True)
+    parser.add_argument("--results", type=str, required=True)
+    parser.add_argument("--failure_rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    count = make_batch_results(args.requests, args.results, args.failure_rate)
+    print(f"wrote {count} results to {args.results}")
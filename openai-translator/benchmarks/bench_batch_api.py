@@ -0,0 +1,60 @@
+"""Batch API 模式端到端验证：导出请求 -> 本地替身生成结果 -> 写回 Book 并导出译文，全程不访问网络。
+
+用法（在 openai-translator 目录下）：
+    python benchmarks/bench_batch_api.py --book tests/test.pdf
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "ai_translator"))
+
+from model import Model
+from translator import PDFTranslator
+from batch_stub import make_batch_results
+
+
+class StubBatchModel(Model):
+    def model_name(self) -> str:
+        return "StubBatchModel"
+
+    def make_batch_request(self, prompt: str) -> dict:
+        return {"url": "/v1/chat/completions",
+                "body": {"model": "stub", "messages": [{"role": "user", "content": prompt}]}}
+
+    def make_request(self, prompt):
+        raise AssertionError("Batch API 模式不应发送在线请求")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the Batch API export/apply round trip against a local stand-in.")
+    parser.add_argument("--book", type=str, default="tests/test.pdf")
+    parser.add_argument("--file_format", type=str, default="markdown")
+    parser.add_argument("--failure_rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="batch_api_")
+    requests_file = os.path.join(work_dir, "requests.jsonl")
+    results_file = os.path.join(work_dir, "results.jsonl")
+    output_file = os.path.join(work_dir, "translated." + ("md" if args.file_format.lower() == "markdown" else "pdf"))
+    translator = PDFTranslator(StubBatchModel())
+
+    start_time = time.perf_counter()
+    translator.translate_pdf(args.book, args.file_format, batch_requests_file=requests_file)
+    export_seconds = time.perf_counter() - start_time
+
+    count = make_batch_results(requests_file, results_file, args.failure_rate)
+
+    start_time = time.perf_counter()
+    translator.translate_pdf(args.book, args.file_format, output_file_path=output_file, batch_results_file=results_file)
+    apply_seconds = time.perf_counter() - start_time
+
+    contents = [content for page in translator.book.pages for content in page.contents]
+    failed = sum(1 for content in contents if not content.status)
+    print(f"requests: {count}  blocks: {len(contents)}  failed blocks: {failed}")
+    print(f"export: {export_seconds:.3f}s  apply: {apply_seconds:.3f}s  output: {output_file}")
+    # 替身没有注入失败时，任何失败的内容块都说明请求与结果没有正确对应
+    if failed and args.failure_rate == 0:
+        sys.exit(1)
@@ -0,0 +1,84 @@
+"""GLMModel 客户端基准：对比逐次 requests.post、连接池 Session 和异步客户端的吞吐量。
+
+用法（在 openai-translator 目录下）：
+    python benchmarks/bench_glm_client.py --requests 500 --concurrency 16
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "ai_translator"))
+
+from model import GLMModel
+from glm_stub_server import start_stub_server
+
+
+def counting_errors(fn):
+    # 单个请求失败（例如连接被重置）只计数，不中断整轮对比
+    def call(prompt):
+        try:
+            fn(prompt)
+            return 0
+        except Exception:
+            return 1
+    return call
+
+
+def bench_bare_requests(model_url: str, prompts, concurrency: int):
+    def post(prompt):
+        response = requests.post(model_url, json={"prompt": prompt, "history": []}, timeout=30)
+        return response.json()["response"]
+
+    start_time = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        errors = sum(executor.map(counting_errors(post), prompts))
+    return time.perf_counter() - start_time, errors
+
+
+def bench_pooled_session(model_url: str, prompts, concurrency: int):
+    model = GLMModel(model_url, timeout=30, pool_size=concurrency)
+    start_time = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        errors = sum(executor.map(counting_errors(model.make_request), prompts))
+    elapsed = time.perf_counter() - start_time
+    model.close()
+    return elapsed, errors
+
+
+def bench_async(model_url: str, prompts, concurrency: int):
+    model = GLMModel(model_url, timeout=30, pool_size=concurrency)
+
+    async def run():
+        results = await asyncio.gather(*(model.make_request_async(prompt) for prompt in prompts), return_exceptions=True)
+        await model.close_async()
+        return sum(isinstance(result, Exception) for result in results)
+
+    start_time = time.perf_counter()
+    errors = asyncio.run(run())
+    return time.perf_counter() - start_time, errors
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark GLMModel HTTP clients against a local stub server.")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.0, help="Simulated server latency in seconds.")
+    args = parser.parse_args()
+
+    server = start_stub_server(latency=args.latency)
+    model_url = f"http://127.0.0.1:{server.server_address[1]}"
+    prompts = [f"翻译为中文：paragraph {i}" for i in range(args.requests)]
+
+    print(f"{'client':>16} {'seconds':>9} {'req/s':>9} {'errors':>7}")
+    for name, bench in [("requests.post", bench_bare_requests),
+                        ("pooled session", bench_pooled_session),
+                        ("async", bench_async)]:
+        elapsed, errors = bench(model_url, prompts, args.concurrency)
+        print(f"{name:>16} {elapsed:>9.3f} {args.requests / elapsed:>9.1f} {errors:>7}")
+
+    server.shutdown()
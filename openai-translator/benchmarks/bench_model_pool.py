@@ -0,0 +1,87 @@
+"""ModelPool 基准：在本地替身服务上对比单后端、负载均衡和对冲请求的尾延迟。
+
+三个替身：正常副本、有长尾延迟的副本、经常返回 500 的副本。
+另有一组恢复测试：一个副本只有第一个请求失败，剔除期结束后应重新分到流量。
+
+用法（在 openai-translator 目录下）：
+    python benchmarks/bench_model_pool.py --requests 400 --concurrency 16 --hedge_after 0.1
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "ai_translator"))
+
+from model import GLMModel, ModelPool, Backend
+from glm_stub_server import start_stub_server
+
+
+def percentile(values, ratio: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(ratio * len(values)))]
+
+
+def run(model, prompts, concurrency: int):
+    latencies, failures = [], 0
+
+    def request(prompt):
+        start_time = time.perf_counter()
+        try:
+            model.make_request(prompt)
+            return time.perf_counter() - start_time, True
+        except Exception:
+            return time.perf_counter() - start_time, False
+
+    start_time = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for latency, ok in executor.map(request, prompts):
+            latencies.append(latency)
+            failures += 0 if ok else 1
+    return time.perf_counter() - start_time, latencies, failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark ModelPool load balancing and hedging against local stub servers.")
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--hedge_after", type=float, default=0.1)
+    args = parser.parse_args()
+
+    servers = [
+        start_stub_server(latency=args.latency),
+        start_stub_server(latency=args.latency, slow_rate=0.1, slow_latency=1.0),
+        start_stub_server(latency=args.latency, failure_rate=0.5),
+    ]
+    urls = [f"http://127.0.0.1:{server.server_address[1]}" for server in servers]
+    prompts = [f"翻译为中文：paragraph {i}" for i in range(args.requests)]
+
+    def make_pool(hedge_after):
+        backends = [Backend(GLMModel(url, timeout=30, pool_size=args.concurrency), capacity=args.concurrency) for url in urls]
+        return ModelPool(backends, eject_seconds=2.0, hedge_after=hedge_after)
+
+    print(f"{'setup':>18} {'seconds':>8} {'p50':>7} {'p99':>7} {'failed':>7}")
+    for name, model in [("slow replica only", GLMModel(urls[1], timeout=30, pool_size=args.concurrency)),
+                        ("pool", make_pool(None)),
+                        ("pool + hedging", make_pool(args.hedge_after))]:
+        elapsed, latencies, failures = run(model, prompts, args.concurrency)
+        print(f"{name:>18} {elapsed:>8.3f} {percentile(latencies, 0.5):>7.3f} {percentile(latencies, 0.99):>7.3f} {failures:>7}")
+        if isinstance(model, ModelPool):
+            print(f"{'':>18} {model.metrics()}")
+        model.close()
+
+    # 恢复测试：flaky 副本第一个请求失败后被剔除，探测成功后应与其他副本平分流量
+    recovery_servers = [start_stub_server(latency=args.latency), start_stub_server(latency=args.latency),
+                        start_stub_server(latency=args.latency, fail_first=1)]
+    backends = [Backend(GLMModel(f"http://127.0.0.1:{server.server_address[1]}", timeout=30, pool_size=args.concurrency),
+                        capacity=args.concurrency) for server in recovery_servers]
+    pool = ModelPool(backends, eject_after_failures=1, eject_seconds=0.2)
+    elapsed, latencies, failures = run(pool, prompts, args.concurrency)
+    requests_per_backend = [backend["requests"] for backend in pool.metrics()["backends"]]
+    print(f"\nrecovery: {elapsed:.3f}s, failed {failures}, requests per backend (last is flaky): {requests_per_backend}")
+    pool.close()
+
+    for server in servers + recovery_servers:
+        server.shutdown()
@@ -0,0 +1,95 @@
+"""本地 ChatGLM HTTP 服务替身，接口与 ChatGLM-6B api.py 相同，用于测试和基准测试。
+
+用法（在 openai-translator 目录下）：
+    python benchmarks/glm_stub_server.py --port 8000 --latency 0.05
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class GLMStubHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 才会保持长连接，方便对比连接复用的效果
+    protocol_version = "HTTP/1.1"
+    latency = 0.0
+    # 模拟故障和长尾延迟：failure_rate 的请求返回 500，slow_rate 的请求额外等待 slow_latency 秒
+    failure_rate = 0.0
+    slow_rate = 0.0
+    slow_latency = 0.0
+    # 模拟短暂故障后恢复：前 fail_first 个请求返回 500
+    fail_first = 0
+    served = None
+    served_lock = None
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        time.sleep(self.latency + (self.slow_latency if random.random() < self.slow_rate else 0.0))
+
+        with self.served_lock:
+            self.served[0] += 1
+            early = self.served[0] <= self.fail_first
+        if early or random.random() < self.failure_rate:
+            self.send_response(500)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        prompt = payload.get("prompt", "")
+        body = json.dumps({
+            "response": f"[译文] {prompt}",
+            "history": [],
+            "status": 200,
+        }, ensure_ascii=False).encode("utf-8")
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubHTTPServer(ThreadingHTTPServer):
+    # 默认 listen backlog 只有 5，高并发的基准测试会遇到连接被重置
+    request_queue_size = 128
+    daemon_threads = True
+
+
+def make_handler(latency: float = 0.0, failure_rate: float = 0.0, slow_rate: float = 0.0,
+                 slow_latency: float = 0.0, fail_first: int = 0):
+    # 每个服务实例一个独立的处理类，请求计数不会在实例之间共享
+    return type("Handler", (GLMStubHandler,), {"latency": latency, "failure_rate": failure_rate,
+                                               "slow_rate": slow_rate, "slow_latency": slow_latency,
+                                               "fail_first": fail_first, "served": [0],
+                                               "served_lock": threading.Lock()})
+
+
+def start_stub_server(port: int = 0, latency: float = 0.0, failure_rate: float = 0.0,
+                      slow_rate: float = 0.0, slow_latency: float = 0.0, fail_first: int = 0) -> StubHTTPServer:
+    """在后台线程中启动替身服务，port 为 0 时由系统分配端口。"""
+    handler = make_handler(latency, failure_rate, slow_rate, slow_latency, fail_first)
+    server = StubHTTPServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local stand-in for a ChatGLM HTTP server.")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds to wait before answering each request.")
+    parser.add_argument("--failure_rate", type=float, default=0.0, help="Fraction of requests answered with HTTP 500.")
+    parser.add_argument("--slow_rate", type=float, default=0.0, help="Fraction of requests delayed by --slow_latency.")
+    parser.add_argument("--slow_latency", type=float, default=0.0, help="Extra seconds for slow requests.")
+    parser.add_argument("--fail_first", type=int, default=0, help="Answer the first N requests with HTTP 500.")
+    args = parser.parse_args()
+
+    handler = make_handler(args.latency, args.failure_rate, args.slow_rate, args.slow_latency, args.fail_first)
+    server = StubHTTPServer(("0.0.0.0", args.port), handler)
+    print(f"ChatGLM stub server listening on :{args.port}")
+    server.serve_forever()